@@ -0,0 +1,124 @@
+"""
+Role assignment throughput for /attendance against a local fake of Discord's HTTP API.
+
+Usage (from the project root):
+    python -m benchmarks.bench_attendance [--members 60] [--latency 0.25] [--limit 10] [--window 1.0]
+                                          [--error-rate 0.03] [--surprise-429 0.02]
+
+The fake route answers after `latency` seconds and allows `limit` requests per `window`
+seconds. Like discord.py, callers wait for the window to reset once the bucket is spent.
+On top of that it answers 429 (bucket shared with other traffic) at `surprise-429` and
+fails with a 502 at `error-rate`. The previous sequential loop is compared with
+RoleAssigner at several concurrency levels.
+"""
+import argparse
+import asyncio
+import random
+import time
+
+import discord
+
+from utils.role_assigner import RoleAssigner
+
+
+class FakeResponse:
+    def __init__(self, status, reason, headers=None):
+        self.status = status
+        self.reason = reason
+        self.headers = headers or {}
+
+
+class FakeRoute:
+    """Fixed-window rate limited endpoint, like a Discord per-route bucket."""
+
+    def __init__(self, latency, limit, window, error_rate, surprise_429, seed=1):
+        self.latency = latency
+        self.limit = limit
+        self.window = window
+        self.error_rate = error_rate
+        self.surprise_429 = surprise_429
+        self.rng = random.Random(seed)
+        self.window_start = 0.0
+        self.used = 0
+        self.requests = 0
+        self.rate_limited = 0
+
+    async def request(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            now = loop.time()
+            if now - self.window_start >= self.window:
+                self.window_start, self.used = now, 0
+            if self.used < self.limit:
+                break
+            # Bucket spent: wait for the reset, as discord.py does
+            await asyncio.sleep(self.window - (now - self.window_start))
+        self.used += 1
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+        if self.rng.random() < self.surprise_429:
+            self.rate_limited += 1
+            raise discord.HTTPException(FakeResponse(429, "Too Many Requests", {'Retry-After': "0.5"}), {'message': "You are being rate limited."})
+        if self.rng.random() < self.error_rate:
+            raise discord.HTTPException(FakeResponse(502, "Bad Gateway"), "")
+
+
+class FakeMember:
+    def __init__(self, member_id, route):
+        self.id = member_id
+        self.name = f"member{member_id}"
+        self.route = route
+
+    async def add_roles(self, role, reason=None):
+        await self.route.request()
+
+    def __str__(self):
+        return self.name
+
+
+async def legacy_assign(members, role):
+    """The previous /attendance loop: one member at a time, no retries."""
+    given, failed = 0, 0
+    for member in members:
+        try:
+            await member.add_roles(role)
+            given += 1
+        except discord.Forbidden:
+            failed += 1
+        except Exception:
+            failed += 1
+    return given, failed
+
+
+async def scenario(name, args, runner):
+    route = FakeRoute(args.latency, args.limit, args.window, args.error_rate, args.surprise_429)
+    members = [FakeMember(i, route) for i in range(args.members)]
+    start = time.perf_counter()
+    given, failed = await runner(members)
+    elapsed = time.perf_counter() - start
+    print(f"  {name:<22} {elapsed:6.2f} s | given {given:3} | failed {failed:3} | requests {route.requests:3} | 429s {route.rate_limited}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--members", type=int, default=60)
+    parser.add_argument("--latency", type=float, default=0.25)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--window", type=float, default=1.0)
+    parser.add_argument("--error-rate", type=float, default=0.03)
+    parser.add_argument("--surprise-429", type=float, default=0.02)
+    args = parser.parse_args()
+
+    role = object()
+    print(f"{args.members} members, {args.latency * 1000:.0f} ms latency, {args.limit} req / {args.window} s, {args.error_rate:.0%} 502s, {args.surprise_429:.0%} 429s")
+
+    await scenario("sequential (old)", args, lambda members: legacy_assign(members, role))
+    for concurrency in (1, 5, 10):
+        async def run(members, concurrency=concurrency):
+            assigner = await RoleAssigner(role, concurrency=concurrency, base_delay=0.2).run(members)
+            return len(assigner.given), assigner.failed
+        await scenario(f"RoleAssigner x{concurrency}", args, run)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
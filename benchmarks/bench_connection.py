@@ -0,0 +1,132 @@
+"""
+Per-query latency of the repositories: connect-per-call vs the persistent tuned connection.
+
+Usage (from the project root):
+    python -m benchmarks.bench_connection [--contents 3000] [--logs 5000] [--queries 2000]
+
+A throwaway database is filled with synthetic contents, templates and logs, then the
+same lookups are timed twice: once with a fresh sqlite3 connection per query (the old
+DatabaseConnection behaviour) and once through the shared DatabaseConnection.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from utils.db.connection import DatabaseConnection
+from utils.db.repositories.logs import LogRepository
+from utils.db.repositories.templates import TemplateRepository
+from utils.db.repositories.contents import ContentRepository
+from utils.db.migrations import migrate
+
+
+class PerCallConnection:
+    """Reproduces the previous behaviour: a brand new connection for every query."""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db")
+
+    def get_connection(self):
+        conn = sqlite3.connect(self.db_path, detect_types=sqlite3.PARSE_DECLTYPES)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    run = DatabaseConnection.run
+
+
+def build_repositories(connection):
+    return (
+        LogRepository(connection),
+        TemplateRepository(connection),
+        ContentRepository(connection)
+    )
+
+
+def populate(db_path, n_contents, n_logs):
+    conn = sqlite3.connect(db_path, detect_types=sqlite3.PARSE_DECLTYPES)
+    roles = [[f"Role {p}-{r}" for r in range(20)] for p in range(3)]
+    conn.executemany(
+        'INSERT INTO templates (name, roles) VALUES (?, ?)',
+        [(f"template_{i}", json.dumps(roles)) for i in range(50)]
+    )
+    conn.executemany(
+        'INSERT INTO active_contents_v2 (id, message_id, channel_id, name, template_name, description, slot_count) VALUES (?, ?, ?, ?, ?, ?, ?)',
+        [(i + 1, 1_000_000 + i, 500 + i % 20, f"Content {i}", f"template_{i % 50}", "", 60) for i in range(n_contents)]
+    )
+    conn.executemany(
+        'INSERT INTO content_slots (content_id, slot_index, player) VALUES (?, ?, ?)',
+        [(i + 1, s, f"Player{i}_{s}") for i in range(n_contents) for s in range(1, 60, 2)]
+    )
+    conn.executemany(
+        'INSERT INTO content_signups (content_id, user_id, name, role) VALUES (?, ?, ?, ?)',
+        [(i + 1, u, f"User{u}", "DPS") for i in range(n_contents) for u in range(15)]
+    )
+    now = datetime.now()
+    conn.executemany(
+        'INSERT INTO command_logs (user_id, username, command_name, channel_id, timestamp, args, status, execution_time, error_message) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+        [(i % 300, f"user{i % 300}", "content_edit", 500, now, "{}", "SUCCESS", 12.5, None) for i in range(n_logs)]
+    )
+    conn.commit()
+    conn.close()
+
+
+async def time_queries(name, repos, n_queries, n_contents, n_logs):
+    logs, templates, contents = repos
+    rng = random.Random(42)
+    # The uncached loaders are called directly: repository caches would otherwise hide the query cost
+    cases = {
+        "get_template": lambda: templates._load_template(f"template_{rng.randrange(50)}"),
+        "get_content_by_message_id": lambda: contents._load_content('message_id', 1_000_000 + rng.randrange(n_contents)),
+        "get_log_details": lambda: logs.get_log_details(rng.randrange(1, n_logs + 1)),
+    }
+    results = {}
+    for case, call in cases.items():
+        samples = []
+        for _ in range(n_queries):
+            start = time.perf_counter()
+            await call()
+            samples.append((time.perf_counter() - start) * 1000)
+        results[case] = {
+            "mean_ms": statistics.fmean(samples),
+            "p50_ms": statistics.median(samples),
+            "p95_ms": statistics.quantiles(samples, n=20)[-1],
+        }
+    print(f"\n[{name}]")
+    for case, r in results.items():
+        print(f"  {case:<28} mean {r['mean_ms']:.3f} ms | p50 {r['p50_ms']:.3f} ms | p95 {r['p95_ms']:.3f} ms")
+    return results
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--contents", type=int, default=3000)
+    parser.add_argument("--logs", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        connection = DatabaseConnection(db_path)
+        repos = build_repositories(connection)
+        migrate(connection.get_connection())
+        populate(db_path, args.contents, args.logs)
+
+        before = await time_queries("connect per call", build_repositories(PerCallConnection(db_path)), args.queries, args.contents, args.logs)
+        after = await time_queries("persistent connection", repos, args.queries, args.contents, args.logs)
+
+        print("\nSpeedup (mean):")
+        for case in before:
+            print(f"  {case:<28} x{before[case]['mean_ms'] / after[case]['mean_ms']:.1f}")
+        connection.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
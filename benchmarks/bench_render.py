@@ -0,0 +1,51 @@
+"""
+Roster rendering cost of ContentView.generate_view_str, with and without the party render cache.
+
+Usage (from the project root):
+    python -m benchmarks.bench_render [--parties 10] [--roles 20] [--refreshes 2000]
+
+Each refresh changes a single slot, like a sign-up being assigned, and re-renders the
+whole roster, which is what every embed refresh does.
+"""
+import argparse
+import random
+import time
+
+from cogs.content import ContentView
+
+
+def run(parties, data, refreshes, cached):
+    rng = random.Random(7)
+    render = ContentView._render_party
+    render.cache_clear()
+    start = time.perf_counter()
+    for n in range(refreshes):
+        slot = rng.randrange(len(data))
+        data[slot] = [] if data[slot] else [f"Player{n}"]
+        if not cached:
+            render.cache_clear()
+        ContentView.generate_view_str(parties, data)
+    return (time.perf_counter() - start) * 1000 / refreshes, render.cache_info()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--parties", type=int, default=10)
+    parser.add_argument("--roles", type=int, default=20)
+    parser.add_argument("--refreshes", type=int, default=2000)
+    args = parser.parse_args()
+
+    parties = [[f"Role {p + 1}-{r + 1}" for r in range(args.roles)] for p in range(args.parties)]
+    base = [[f"Player{s}"] if s % 3 == 0 else [] for s in range(args.parties * args.roles)]
+
+    uncached_ms, _ = run(parties, [list(s) for s in base], args.refreshes, cached=False)
+    cached_ms, info = run(parties, [list(s) for s in base], args.refreshes, cached=True)
+
+    print(f"{args.parties} parties x {args.roles} roles, {args.refreshes} refreshes")
+    print(f"  without cache: {uncached_ms:.3f} ms / render")
+    print(f"  with cache:    {cached_ms:.3f} ms / render (hits {info.hits}, misses {info.misses})")
+    print(f"  speedup:       x{uncached_ms / cached_ms:.1f}")
+
+
+if __name__ == "__main__":
+    main()
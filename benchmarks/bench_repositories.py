@@ -0,0 +1,285 @@
+"""
+Per-method timings of LogRepository, TemplateRepository and ContentRepository on a large synthetic database.
+
+Usage (from the project root):
+    python -m benchmarks.bench_repositories [--logs 500000] [--contents 5000] [--templates 200]
+                                            [--iterations 200] [--json results.json]
+                                            [--baseline previous.json --tolerance 0.25]
+
+The database is generated once (in a temp dir, or at --db to keep it around) and every
+public repository method is timed through the real DatabaseConnection executor. Methods
+that are served from a cache are timed twice: "cold" clears the cache before each call,
+"warm" hits it. Mutations run on their own rows so they don't disturb the read cases.
+
+--json writes the results for later comparison; --baseline compares the means against
+such a file and exits with status 1 if any method got slower than --tolerance allows.
+"""
+import argparse
+import asyncio
+import inspect
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from utils.db.connection import DatabaseConnection
+from utils.db.repositories.logs import LogRepository
+from utils.db.repositories.templates import TemplateRepository
+from utils.db.repositories.contents import ContentRepository
+from utils.db.migrations import backfill_log_rollups, migrate
+
+CHANNELS = 20
+PARTIES = 10
+ROLES_PER_PARTY = 20
+FILLED_SLOTS = 150
+SIGNUPS = 40
+
+# repository: "logs" | "templates" | "contents"; call/setup take the iteration number.
+# warmup: run every call once untimed first, so cache hits are measured.
+Case = namedtuple("Case", "repository method name call setup iterations warmup", defaults=(None, None, False))
+
+
+def populate(db_path, n_logs, n_contents, n_templates):
+    rng = random.Random(1)
+    conn = sqlite3.connect(db_path, detect_types=sqlite3.PARSE_DECLTYPES)
+
+    roles = [[f"Role {p}-{r}" for r in range(ROLES_PER_PARTY)] for p in range(PARTIES)]
+    conn.executemany(
+        'INSERT INTO templates (name, roles) VALUES (?, ?)',
+        [(f"template_{i}", json.dumps(roles)) for i in range(n_templates)]
+    )
+
+    slot_count = PARTIES * ROLES_PER_PARTY
+    conn.executemany(
+        'INSERT INTO active_contents_v2 (id, message_id, channel_id, name, template_name, description, slot_count) VALUES (?, ?, ?, ?, ?, ?, ?)',
+        [(i + 1, 1_000_000 + i, 500 + i % CHANNELS, f"Content {i}", f"template_{i % n_templates}", "Synthetic content", slot_count) for i in range(n_contents)]
+    )
+    conn.executemany(
+        'INSERT INTO content_slots (content_id, slot_index, player) VALUES (?, ?, ?)',
+        ((i + 1, s, f"Player{i}_{s}") for i in range(n_contents) for s in rng.sample(range(slot_count), FILLED_SLOTS))
+    )
+    conn.executemany(
+        'INSERT INTO content_signups (content_id, user_id, name, role) VALUES (?, ?, ?, ?)',
+        ((i + 1, u, f"User{u}", "DPS") for i in range(n_contents) for u in range(SIGNUPS))
+    )
+
+    start = datetime.now() - timedelta(seconds=n_logs)
+    commands = ["content_edit", "content_register", "attendance", "splitcomplate", "content_create"]
+    conn.executemany(
+        'INSERT INTO command_logs (user_id, username, command_name, channel_id, timestamp, args, status, execution_time, error_message) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+        ((i % 300, f"user{i % 300}", commands[i % len(commands)], 500 + i % CHANNELS, start + timedelta(seconds=i),
+          '{"role": "DPS", "player": "Player"}', "SUCCESS", rng.uniform(5, 200), None) for i in range(n_logs))
+    )
+    backfill_log_rollups(conn)
+    conn.commit()
+    conn.close()
+
+
+def summarize(samples):
+    quantiles = statistics.quantiles(samples, n=100, method="inclusive")
+    return {
+        "n": len(samples),
+        "mean_ms": statistics.fmean(samples),
+        "p50_ms": quantiles[49],
+        "p95_ms": quantiles[94],
+        "p99_ms": quantiles[98],
+        "min_ms": min(samples),
+        "max_ms": max(samples),
+    }
+
+
+async def measure(case, iterations):
+    """Only case.call is timed; case.setup runs before every call."""
+    async def call(i):
+        result = case.call(i)
+        if inspect.isawaitable(result):
+            await result
+
+    if case.warmup:
+        for i in range(iterations):
+            await call(i)
+
+    samples = []
+    for i in range(iterations):
+        if case.setup:
+            case.setup(i)
+        start = time.perf_counter()
+        await call(i)
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples)
+
+
+async def make_scratch(contents, count):
+    """Empty contents in a channel of their own, used by the mutation cases so the read cases see a stable dataset."""
+    return [
+        await contents.create_content(9_000_000 + i, 999, f"Scratch {i}", "template_0", [[] for _ in range(PARTIES * ROLES_PER_PARTY)])
+        for i in range(count)
+    ]
+
+
+def build_cases(logs, templates, contents, args, scratch_ids):
+    rng = random.Random(42)
+    n_logs, n_contents, n_templates = args.logs, args.contents, args.templates
+    some_content = lambda: rng.randrange(1, n_contents + 1)
+    some_template = lambda: f"template_{rng.randrange(n_templates)}"
+    channel = lambda: 500 + rng.randrange(CHANNELS)
+    row = lambda i: LogRepository.build_row(i, f"user{i}", "bench", 500, {"i": i}, "SUCCESS", 10.0)
+    conn = logs.db_connection.get_connection()
+    # (timestamp, id) cursors halfway down the table, as PaginationView keeps them
+    deep_cursors = [tuple(r) for r in conn.execute('SELECT timestamp, id FROM command_logs WHERE id <= ? ORDER BY id DESC LIMIT ?', (n_logs // 2, args.iterations))]
+    oldest_log = conn.execute('SELECT timestamp FROM command_logs ORDER BY timestamp LIMIT 1').fetchone()[0]
+
+    def clear_content_cache(_):
+        contents.cache = type(contents.cache)(contents.cache.max_size)
+
+    def clear_template_cache(_):
+        templates._cache.clear()
+        templates._names = None
+
+    def clear_channel_index(_):
+        contents._channel_index.clear()
+
+    return [
+        Case("schema", "migrate", "migrate[current]", lambda i: logs.db_connection.run(migrate, logs.db_connection.get_connection())),
+
+        Case("logs", "build_row", "build_row", row),
+        Case("logs", "log_command", "log_command", lambda i: logs.log_command(*row(i)[:4], {"i": i}, "SUCCESS", 10.0)),
+        Case("logs", "log_commands", "log_commands[100]", lambda i: logs.log_commands([row(i) for _ in range(100)])),
+        Case("logs", "get_logs", "get_logs[first page]", lambda i: logs.get_logs(10)),
+        Case("logs", "get_logs", "get_logs[deep cursor]", lambda i: logs.get_logs(10, deep_cursors[i % len(deep_cursors)])),
+        Case("logs", "get_total_log_count", "get_total_log_count", lambda i: logs.get_total_log_count()),
+        Case("logs", "get_log_by_id", "get_log_by_id", lambda i: logs.get_log_by_id(rng.randrange(1, n_logs + 1))),
+        Case("logs", "get_log_details", "get_log_details", lambda i: logs.get_log_details(rng.randrange(1, n_logs + 1))),
+        Case("logs", "get_command_stats", "get_command_stats[24h]", lambda i: logs.get_command_stats(datetime.now() - timedelta(hours=24))),
+        Case("logs", "get_command_stats", "get_command_stats[30d]", lambda i: logs.get_command_stats(datetime.now() - timedelta(days=30))),
+
+        Case("templates", "get_template", "get_template[cold]", lambda i: templates.get_template(some_template()), clear_template_cache),
+        Case("templates", "get_template", "get_template[warm]", lambda i: templates.get_template(f"template_{i % 16}"), warmup=True),
+        Case("templates", "get_all_templates", "get_all_templates[cold]", lambda i: templates.get_all_templates(), clear_template_cache),
+        Case("templates", "get_all_templates", "get_all_templates[warm]", lambda i: templates.get_all_templates(), warmup=True),
+        Case("templates", "save_template", "save_template", lambda i: templates.save_template(f"scratch_{i}", [["Tank", "Healer"], ["DPS"] * 18])),
+        Case("templates", "delete_template", "delete_template", lambda i: templates.delete_template(f"scratch_{i}")),
+
+        Case("contents", "get_content", "get_content[cold]", lambda i: contents.get_content(some_content()), clear_content_cache),
+        Case("contents", "get_content", "get_content[warm]", lambda i: contents.get_content(1 + i % 64), warmup=True),
+        Case("contents", "get_content_by_message_id", "get_content_by_message_id[cold]", lambda i: contents.get_content_by_message_id(999_999 + some_content()), clear_content_cache),
+        Case("contents", "get_content_by_message_id", "get_content_by_message_id[warm]", lambda i: contents.get_content_by_message_id(1_000_000 + i % 64), warmup=True),
+        Case("contents", "get_latest_content_by_channel", "get_latest_content_by_channel", lambda i: contents.get_latest_content_by_channel(channel())),
+        Case("contents", "get_active_contents_by_channel", "get_active_contents_by_channel", lambda i: contents.get_active_contents_by_channel(channel()), iterations=10),
+        Case("contents", "search_contents", "search_contents[cold]", lambda i: contents.search_contents(channel(), "content 1"), clear_channel_index),
+        Case("contents", "search_contents", "search_contents[warm]", lambda i: contents.search_contents(500 + i % CHANNELS, "content 1"), warmup=True),
+        Case("contents", "find_content_id_by_name", "find_content_id_by_name", lambda i: contents.find_content_id_by_name(channel(), f"Content {rng.randrange(n_contents)}")),
+        Case("contents", "create_content", "create_content", lambda i: contents.create_content(8_000_000 + i, 998, f"Created {i}", "template_0", [[] for _ in range(PARTIES * ROLES_PER_PARTY)])),
+        Case("contents", "add_signup", "add_signup", lambda i: contents.add_signup(scratch_ids[i % len(scratch_ids)], 100_000 + i, f"Bench{i}", "DPS")),
+        Case("contents", "remove_signup", "remove_signup", lambda i: contents.remove_signup(scratch_ids[i % len(scratch_ids)], 100_000 + i)),
+        Case("contents", "assign_slot", "assign_slot", lambda i: contents.assign_slot(scratch_ids[i % len(scratch_ids)], i % 200, f"Bench{i}")),
+        Case("contents", "remove_slot_player", "remove_slot_player", lambda i: contents.remove_slot_player(scratch_ids[i % len(scratch_ids)], i % 200, f"Bench{i}")),
+        Case("contents", "clear_slot", "clear_slot", lambda i: contents.clear_slot(scratch_ids[i % len(scratch_ids)], i % 200)),
+        Case("contents", "delete_content", "delete_content", lambda i: contents.delete_content(scratch_ids[i])),
+
+        # Last: deletes the oldest logs (synthetic logs are one second apart, so 1000 per call)
+        Case("logs", "archive_older_than", "archive_older_than[1000]", lambda i: logs.archive_older_than(oldest_log + timedelta(seconds=1000 * (i + 1)), "bench_archive.db"), iterations=20),
+    ]
+
+
+def public_methods(cls):
+    return {name for name, member in inspect.getmembers(cls, callable) if not name.startswith('_')}
+
+
+def compare(results, baseline_path, tolerance):
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    regressions = []
+    print(f"\nCompared with {baseline_path} (tolerance {tolerance:.0%}):")
+    for case, r in results.items():
+        before = baseline.get(case)
+        if not before:
+            continue
+        ratio = r["mean_ms"] / before["mean_ms"] if before["mean_ms"] else 1.0
+        flag = "REGRESSION" if ratio > 1 + tolerance else ""
+        if flag:
+            regressions.append(case)
+        print(f"  {case:<40} {before['mean_ms']:9.3f} -> {r['mean_ms']:9.3f} ms  x{ratio:5.2f} {flag}")
+    return regressions
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logs", type=int, default=500_000)
+    parser.add_argument("--contents", type=int, default=5000)
+    parser.add_argument("--templates", type=int, default=200)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--db", help="generate the database at this path and keep it (reused if it exists)")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="results file of a previous run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown vs the baseline (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    tmp = None
+    db_path = args.db
+    if db_path is None:
+        tmp = tempfile.TemporaryDirectory()
+        db_path = os.path.join(tmp.name, "database.db")
+    fresh = not os.path.exists(db_path)
+
+    connection = DatabaseConnection(os.path.abspath(db_path))
+    logs, templates, contents = LogRepository(connection), TemplateRepository(connection), ContentRepository(connection)
+    migrate(connection.get_connection())
+    if fresh:
+        print(f"Generating {args.logs} logs, {args.contents} contents, {args.templates} templates...")
+        start = time.perf_counter()
+        populate(db_path, args.logs, args.contents, args.templates)
+        print(f"  done in {time.perf_counter() - start:.1f} s")
+
+    scratch_ids = await make_scratch(contents, args.iterations)
+    cases = build_cases(logs, templates, contents, args, scratch_ids)
+
+    covered = {}
+    for case in cases:
+        covered.setdefault(case.repository, set()).add(case.method)
+    for repo_name, cls in (("logs", LogRepository), ("templates", TemplateRepository), ("contents", ContentRepository)):
+        missing = public_methods(cls) - covered.get(repo_name, set())
+        if missing:
+            print(f"Warning: {cls.__name__} methods without a benchmark case: {', '.join(sorted(missing))}")
+
+    results = {}
+    print(f"\n{'case':<48} {'mean':>9} {'p50':>9} {'p95':>9} {'p99':>9}  (ms)")
+    for case in cases:
+        key = f"{case.repository}.{case.name}"
+        results[key] = r = await measure(case, case.iterations or args.iterations)
+        print(f"{key:<48} {r['mean_ms']:9.3f} {r['p50_ms']:9.3f} {r['p95_ms']:9.3f} {r['p99_ms']:9.3f}")
+
+    connection.close()
+    if tmp:
+        tmp.cleanup()
+
+    report = {
+        "meta": {
+            "logs": args.logs,
+            "contents": args.contents,
+            "templates": args.templates,
+            "iterations": args.iterations,
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+        },
+        "results": results,
+    }
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline and compare(results, args.baseline, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
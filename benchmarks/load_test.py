@@ -0,0 +1,444 @@
+"""
+Load-test harness: drives the cog handlers with fake Discord objects on a throwaway database.
+
+Usage (from the project root):
+    python -m benchmarks.load_test [--scenario all] [--http-latency 0.05] [--json results.json]
+
+Every Discord call made by the handlers (responses, followups, message edits, role
+changes) goes to a stub HTTP layer that only sleeps `http-latency` seconds and counts the
+request. SQLite runs for real, and every statement the bot executes is counted.
+
+Scenarios:
+    signup_storm       N users press "Kayıt Ol" on one post at the same time, then half unregister
+    many_posts         sign-ups spread over many posts concurrently, plus content autocompletes
+    attendance_large   /attendance on a large voice channel
+    split_autocomplete /splitcomplate autocomplete keystrokes on a 250-role guild
+    showlog            /showlog list, page turns and log details on a large log table
+
+For each scenario it reports throughput, p50/p95/p99 handler latency, DB statements and
+stub HTTP requests.
+"""
+import argparse
+import asyncio
+import contextlib
+import itertools
+import json
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime
+
+import discord
+
+# The harness must own the database: pin the connection singleton to a temp file
+# before anything imports utils.database.
+from utils.db.connection import DatabaseConnection
+
+_tmp_dir = tempfile.TemporaryDirectory()
+DatabaseConnection(os.path.join(_tmp_dir.name, "load_test.db"))
+
+from utils.database import db
+from utils.config import ConfigManager
+from cogs import content as content_cog
+from cogs.attendance import Attendance
+from cogs.split import Split
+from cogs.logger import Logger, PaginationView
+
+# --- Stub HTTP layer ---
+
+class FakeHTTP:
+    def __init__(self, latency):
+        self.latency = latency
+        self.requests = 0
+
+    async def call(self):
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+# --- Fake Discord objects ---
+
+_ids = itertools.count(10_000)
+
+class FakeRole:
+    def __init__(self, guild, name, position, permissions=None, managed=False, default=False):
+        self.id = next(_ids)
+        self.guild = guild
+        self.name = name
+        self.position = position
+        self.permissions = permissions or discord.Permissions.none()
+        self.managed = managed
+        self._default = default
+
+    @property
+    def mention(self):
+        return f"<@&{self.id}>"
+
+    def is_default(self):
+        return self._default
+
+    async def delete(self, reason=None):
+        await self.guild.http.call()
+        self.guild.roles.remove(self)
+
+class FakeMember:
+    def __init__(self, guild, member_id, name, roles=None, bot=False):
+        self.guild = guild
+        self.id = member_id
+        self.name = name
+        self.display_name = name
+        self.roles = roles or []
+        self.bot = bot
+
+    @property
+    def mention(self):
+        return f"<@{self.id}>"
+
+    @property
+    def top_role(self):
+        return max(self.roles, key=lambda r: r.position)
+
+    async def add_roles(self, role, reason=None):
+        await self.guild.http.call()
+        self.roles.append(role)
+
+    def __str__(self):
+        return self.name
+
+class FakeMessage:
+    def __init__(self, http, message_id=None, embeds=None):
+        self.http = http
+        self.id = message_id or next(_ids)
+        self.embeds = embeds or []
+        self.edits = 0
+
+    async def edit(self, **kwargs):
+        await self.http.call()
+        self.edits += 1
+        if kwargs.get('embed'):
+            self.embeds = [kwargs['embed']]
+        return self
+
+class FakeChannel:
+    def __init__(self, guild, name, members=None):
+        self.guild = guild
+        self.id = next(_ids)
+        self.name = name
+        self.members = members or []
+        self.messages = {}
+
+    @property
+    def mention(self):
+        return f"<#{self.id}>"
+
+    async def fetch_message(self, message_id):
+        await self.guild.http.call()
+        return self.messages[message_id]
+
+class FakeGuild:
+    def __init__(self, http):
+        self.http = http
+        self.id = next(_ids)
+        self.roles = [FakeRole(self, "@everyone", 0, default=True)]
+        self.members = {}
+        self.channels = {}
+        bot_role = FakeRole(self, "Gaddar", 1000, discord.Permissions(manage_roles=True), managed=True)
+        self.roles.append(bot_role)
+        self.me = FakeMember(self, next(_ids), "Gaddar", [bot_role], bot=True)
+
+    def add_member(self, name, roles=None):
+        member = FakeMember(self, next(_ids), name, roles)
+        self.members[member.id] = member
+        return member
+
+    def add_channel(self, name, members=None):
+        channel = FakeChannel(self, name, members)
+        self.channels[channel.id] = channel
+        return channel
+
+    def get_member(self, member_id):
+        return self.members.get(member_id)
+
+    def get_role(self, role_id):
+        return next((r for r in self.roles if r.id == role_id), None)
+
+    def get_channel(self, channel_id):
+        return self.channels.get(channel_id)
+
+    async def create_role(self, name, reason=None):
+        await self.http.call()
+        role = FakeRole(self, name, len(self.roles))
+        self.roles.append(role)
+        return role
+
+class FakeResponse:
+    def __init__(self, interaction):
+        self.interaction = interaction
+        self._done = False
+
+    def is_done(self):
+        return self._done
+
+    async def _respond(self):
+        if self._done:
+            raise discord.InteractionResponded(self.interaction)
+        self._done = True
+        await self.interaction.http.call()
+
+    async def send_message(self, content=None, **kwargs):
+        await self._respond()
+
+    async def defer(self, **kwargs):
+        await self._respond()
+
+    async def send_modal(self, modal):
+        await self._respond()
+
+    async def edit_message(self, **kwargs):
+        await self._respond()
+
+class FakeFollowup:
+    def __init__(self, interaction):
+        self.interaction = interaction
+
+    async def send(self, content=None, **kwargs):
+        await self.interaction.http.call()
+        return FakeMessage(self.interaction.http)
+
+class FakeInteraction:
+    def __init__(self, http, user, guild, channel, message=None, command_name=None):
+        self.http = http
+        self.user = user
+        self.guild = guild
+        self.channel = channel
+        self.channel_id = channel.id
+        self.message = message
+        self.command = type("FakeCommand", (), {"name": command_name})() if command_name else None
+        self.namespace = type("FakeNamespace", (), {})()
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup(self)
+
+# --- Measurement ---
+
+class Recorder:
+    def __init__(self):
+        self.latencies = []
+        self.queries = 0
+        self._counting = True
+
+    def trace(self, statement):
+        if self._counting:
+            self.queries += 1
+
+    @contextlib.contextmanager
+    def setup(self):
+        """Statements run inside this block (seeding data) are not counted."""
+        self._counting = False
+        try:
+            yield
+        finally:
+            self._counting = True
+
+    async def timed(self, coro):
+        start = time.perf_counter()
+        await coro
+        self.latencies.append((time.perf_counter() - start) * 1000)
+
+def percentile(samples, q):
+    if len(samples) == 1:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method="inclusive")[q - 1]
+
+async def run_scenario(name, scenario, http, args):
+    recorder = Recorder()
+    db.connection.get_connection().set_trace_callback(recorder.trace)
+    http.requests = 0
+
+    start = time.perf_counter()
+    await scenario(recorder, http, args)
+    # Let coalesced embed refreshes and buffered log writes finish
+    while content_cog.embed_refresher._tasks:
+        await asyncio.sleep(0.05)
+    await db.log_writer.flush()
+    elapsed = time.perf_counter() - start
+
+    db.connection.get_connection().set_trace_callback(None)
+    lat = recorder.latencies
+    result = {
+        "scenario": name,
+        "operations": len(lat),
+        "wall_s": elapsed,
+        "throughput_ops_s": len(lat) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(lat, 50),
+        "p95_ms": percentile(lat, 95),
+        "p99_ms": percentile(lat, 99),
+        "db_statements": recorder.queries,
+        "db_statements_per_op": recorder.queries / len(lat),
+        "http_requests": http.requests,
+    }
+    print(
+        f"{name:<20} {result['operations']:6} ops {result['throughput_ops_s']:9.1f} ops/s | "
+        f"p50 {result['p50_ms']:7.2f} ms  p95 {result['p95_ms']:7.2f} ms  p99 {result['p99_ms']:7.2f} ms | "
+        f"db {result['db_statements']:6} ({result['db_statements_per_op']:.1f}/op) | http {result['http_requests']}"
+    )
+    return result
+
+# --- Scenarios ---
+
+def operator(guild):
+    """A member allowed to run every command (first whitelisted user in config.yml)."""
+    allowed = next(iter(ConfigManager._permissions.values()))[0]
+    user_id = next(iter(allowed))
+    member = guild.get_member(user_id)
+    if member is None:
+        member = FakeMember(guild, user_id, "operator")
+        guild.members[user_id] = member
+    return member
+
+async def create_post(http, guild, channel, name, template_name):
+    """Creates a content post the way DescriptionModal does and returns its message."""
+    template = await db.get_template(template_name)
+    message = FakeMessage(http)
+    channel.messages[message.id] = message
+    await db.create_content(message.id, channel.id, name, template_name, [[] for _ in template['flat_roles']], "")
+    return message
+
+async def signup_storm(recorder, http, args):
+    guild = FakeGuild(http)
+    channel = guild.add_channel("raid")
+    with recorder.setup():
+        message = await create_post(http, guild, channel, "ZvZ", "zvz")
+    users = [guild.add_member(f"player{i}") for i in range(args.users)]
+
+    async def sign_up(user):
+        modal = content_cog.RegisterModal(message.id)
+        modal.role_input._value = "DPS"
+        await recorder.timed(modal.on_submit(FakeInteraction(http, user, guild, channel, message)))
+
+    async def unregister(user):
+        view = content_cog.ContentView(message.id)
+        await recorder.timed(view.unregister_btn.callback(FakeInteraction(http, user, guild, channel, message)))
+
+    await asyncio.gather(*(sign_up(u) for u in users))
+    await asyncio.gather(*(unregister(u) for u in users[::2]))
+
+async def many_posts(recorder, http, args):
+    guild = FakeGuild(http)
+    channels = [guild.add_channel(f"raid-{i}") for i in range(5)]
+    posts = []
+    with recorder.setup():
+        for i in range(args.posts):
+            channel = channels[i % len(channels)]
+            posts.append((channel, await create_post(http, guild, channel, f"Raid {i}", "zvz")))
+    users = [guild.add_member(f"player{i}") for i in range(args.users)]
+    cog = content_cog.Content(None)
+
+    async def sign_up(user, channel, message):
+        modal = content_cog.RegisterModal(message.id)
+        modal.role_input._value = "Healer"
+        await recorder.timed(modal.on_submit(FakeInteraction(http, user, guild, channel, message)))
+
+    async def autocomplete(user, channel, text):
+        await recorder.timed(cog.content_ac(FakeInteraction(http, user, guild, channel), text))
+
+    jobs = []
+    for i, user in enumerate(users):
+        for channel, message in posts[i % len(posts)::max(1, len(posts) // 4)]:
+            jobs.append(sign_up(user, channel, message))
+        jobs.append(autocomplete(user, channels[i % len(channels)], f"raid {i % 10}"))
+    await asyncio.gather(*jobs)
+
+async def attendance_large(recorder, http, args):
+    guild = FakeGuild(http)
+    members = [guild.add_member(f"member{i}") for i in range(args.voice_members)]
+    voice = guild.add_channel("voice", members)
+    text = guild.add_channel("general")
+    user = operator(guild)
+    cog = Attendance(None)
+    for run in range(args.attendance_runs):
+        interaction = FakeInteraction(http, user, guild, text, command_name="attendance")
+        await recorder.timed(cog.attendance.callback(cog, interaction, voice, f"Attendance {run}"))
+
+async def split_autocomplete(recorder, http, args):
+    guild = FakeGuild(http)
+    for i in range(250):
+        perms = discord.Permissions(kick_members=True) if i % 10 == 0 else discord.Permissions.none()
+        guild.roles.append(FakeRole(guild, f"Split Role {i:03}", 2 + i, perms))
+    user = operator(guild)
+    channel = guild.add_channel("general")
+    cog = Split(None)
+    words = ["s", "sp", "spl", "split", "split r", "split role", "split role 1", "split role 12", "split role 123"]
+    for _ in range(args.keystrokes // len(words)):
+        for word in words:
+            await recorder.timed(cog.splitcomplete_autocomplete(FakeInteraction(http, user, guild, channel), word))
+
+    for role in [r for r in guild.roles if r.name.startswith("Split Role 0")][:20]:
+        interaction = FakeInteraction(http, user, guild, channel, command_name="splitcomplate")
+        await recorder.timed(cog.splitcomplete.callback(cog, interaction, str(role.id)))
+
+async def showlog(recorder, http, args):
+    now = datetime.now()
+    conn = db.connection.get_connection()
+    with recorder.setup(), conn:
+        conn.executemany(
+            'INSERT INTO command_logs (user_id, username, command_name, channel_id, timestamp, args, status, execution_time, error_message) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            [(i % 300, f"user{i % 300}", "content_edit", 1, now, "{}", "SUCCESS", 12.5, None) for i in range(args.logs)]
+        )
+
+    guild = FakeGuild(http)
+    user = operator(guild)
+    channel = guild.add_channel("logs")
+    cog = Logger(None)
+    total = await db.get_total_log_count()
+
+    for _ in range(args.log_views):
+        await recorder.timed(cog.showlog.callback(cog, FakeInteraction(http, user, guild, channel), None))
+        with recorder.setup():
+            last = (await db.get_logs(10))[-1]
+            view = PaginationView(1, 20, (last['timestamp'], last['id']))
+        for _ in range(10):
+            await recorder.timed(view.next_button.callback(FakeInteraction(http, user, guild, channel)))
+        await recorder.timed(cog.showlog.callback(cog, FakeInteraction(http, user, guild, channel), total // 2))
+
+SCENARIOS = {
+    "signup_storm": signup_storm,
+    "many_posts": many_posts,
+    "attendance_large": attendance_large,
+    "split_autocomplete": split_autocomplete,
+    "showlog": showlog,
+}
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", choices=["all", *SCENARIOS], default="all")
+    parser.add_argument("--http-latency", type=float, default=0.05, help="seconds per stubbed Discord request")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--posts", type=int, default=40)
+    parser.add_argument("--voice-members", type=int, default=100)
+    parser.add_argument("--attendance-runs", type=int, default=3)
+    parser.add_argument("--keystrokes", type=int, default=900)
+    parser.add_argument("--logs", type=int, default=200_000)
+    parser.add_argument("--log-views", type=int, default=20)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    await db.init()
+    roles = [[f"Role {p}-{r}" for r in ("Tank", "Healer", "DPS", "Support", "Scout")] for p in range(4)]
+    await db.save_template("zvz", roles)
+
+    http = FakeHTTP(args.http_latency)
+    names = list(SCENARIOS) if args.scenario == "all" else [args.scenario]
+    results = [await run_scenario(name, SCENARIOS[name], http, args) for name in names]
+
+    await db.log_writer.stop()
+    await db.connection.shutdown()
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    finally:
+        _tmp_dir.cleanup()
@@ -1,9 +1,11 @@
 import discord
 import os
+import asyncio
 from discord.ext import commands
 from discord import app_commands
 from utils.wrapper import log_execution
 from utils.config import ConfigManager
+from utils.role_assigner import RoleAssigner
 
 # Tehlikeli izinlerin listesi (Bunlar varsa uyarı verilecek)
 DANGEROUS_PERMISSIONS = [
@@ -34,6 +36,23 @@ class ConfirmView(discord.ui.View):
         self.stop()
         await interaction.response.defer()
 
+class CancelRunView(discord.ui.View):
+    """Cancel button shown on the progress message of a running /attendance."""
+    def __init__(self, assigner: RoleAssigner):
+        super().__init__(timeout=None)
+        self.assigner = assigner
+
+    @discord.ui.button(label="Durdur", style=discord.ButtonStyle.danger)
+    async def cancel(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.assigner.cancel()
+        button.disabled = True
+        button.label = "Durduruluyor..."
+        await interaction.response.edit_message(view=self)
+
+# İlerleme mesajı en fazla bu sıklıkta güncellenir (saniye / kişi)
+PROGRESS_INTERVAL = 3.0
+PROGRESS_STEP = 10
+
 class Attendance(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
@@ -118,30 +137,32 @@ class Attendance(commands.Cog):
             await interaction.response.defer(ephemeral=True)
 
         # 4. Rolü Dağıtma
-        given_count = 0
-        failed_count = 0
-        
         members = channel.members
-        processed_users = [] # Log için kullanıcı listesi
         
-        status_msg = await interaction.followup.send(f"⏳ {len(members)} kişiye rol veriliyor...", ephemeral=True)
-
-        for member in members:
-            if member.bot: # Botları atla
-                continue
-                
-            if target_role in member.roles:
-                continue # Zaten rolü varsa geç
-
-            try:
-                await member.add_roles(target_role, reason=f"Attendance: {interaction.user} tarafından verildi.")
-                given_count += 1
-                processed_users.append({"id": member.id, "name": member.name})
-            except discord.Forbidden:
-                failed_count += 1
-            except Exception as e:
-                print(f"Hata ({member}): {e}")
-                failed_count += 1
+        # Botları ve rolü zaten olanları atla
+        targets = [m for m in members if not m.bot and target_role not in m.roles]
+
+        # Sınırlı eşzamanlılıkla dağıt (rate limit'e takılınca tüm işçiler birlikte bekler)
+        assigner = RoleAssigner(target_role, reason=f"Attendance: {interaction.user} tarafından verildi.")
+        cancel_view = CancelRunView(assigner)
+        status_msg = await interaction.followup.send(f"⏳ {len(members)} kişiye rol veriliyor...", view=cancel_view, ephemeral=True, wait=True)
+
+        reporter = asyncio.create_task(self._report_progress(status_msg, assigner, cancel_view))
+        try:
+            await assigner.run(targets)
+        finally:
+            reporter.cancel()
+            cancel_view.stop()
+
+        try:
+            final_status = "⛔ İşlem durduruldu." if assigner.cancelled else "✅ Rol dağıtımı bitti."
+            await status_msg.edit(content=f"{final_status} ({assigner.done}/{assigner.total})", view=None)
+        except discord.HTTPException:
+            pass
+
+        given_count = len(assigner.given)
+        failed_count = assigner.failed
+        processed_users = [{"id": m.id, "name": m.name} for m in assigner.given] # Log için kullanıcı listesi
 
         # Sonuç mesajı
         result_message = f"✅ İşlem Tamamlandı!\n" \
@@ -155,6 +176,9 @@ class Attendance(commands.Cog):
         if failed_count > 0:
             result_message += f"\n❌ Başarısız: {failed_count} (Yetkim yetmemiş olabilir)"
 
+        if assigner.cancelled:
+            result_message += f"\n⛔ İptal edildi: {assigner.skipped} kişiye rol verilmedi."
+
         await interaction.followup.send(result_message, ephemeral=True)
         
         # LOGLAMA İÇİN DEĞER DÖNÜYORUZ
@@ -166,9 +190,35 @@ class Attendance(commands.Cog):
             "role_created": role_created,
             "given_count": given_count,
             "failed_count": failed_count,
+            "cancelled": assigner.cancelled,
+            "skipped_count": assigner.skipped,
             "users": processed_users, 
             "result_message": result_message
         }
 
+    async def _report_progress(self, status_msg: discord.WebhookMessage, assigner: RoleAssigner, view: discord.ui.View):
+        """Edits the status message every PROGRESS_INTERVAL seconds or PROGRESS_STEP members."""
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        last_edit = started
+        last_done = 0
+
+        while True:
+            await asyncio.sleep(1)
+            done = assigner.done
+            now = loop.time()
+            if done == last_done or (done - last_done < PROGRESS_STEP and now - last_edit < PROGRESS_INTERVAL):
+                continue
+
+            elapsed = now - started
+            eta = elapsed / done * (assigner.total - done)
+            text = f"⏳ Rol veriliyor: {done}/{assigner.total} " \
+                   f"(✅ {len(assigner.given)} | ❌ {assigner.failed}) • Kalan süre: ~{eta:.0f} sn"
+            try:
+                await status_msg.edit(content=text, view=view)
+            except discord.HTTPException:
+                pass
+            last_edit, last_done = now, done
+
 async def setup(bot):
     await bot.add_cog(Attendance(bot))
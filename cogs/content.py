@@ -1,9 +1,20 @@
 import discord
+import functools
 from discord.ext import commands
 from discord import app_commands
 from utils.wrapper import log_execution
 from utils.config import ConfigManager
 from utils.database import db
+from utils.refresh import RefreshScheduler
+from utils.locks import KeyedLock
+from utils.db.repositories.templates import normalize_template
+
+# At most one edit per content post per second; a burst of sign-ups collapses into
+# one immediate edit plus one trailing edit with the latest roster.
+embed_refresher = RefreshScheduler(interval=1.0)
+
+# Read-modify-write on a content post is serialized per message_id; different posts never wait on each other
+content_locks = KeyedLock()
 
 # --- Shared UI Components ---
 
@@ -23,32 +34,25 @@ class RegisterModal(discord.ui.Modal, title="Content Kayıt"):
         # We process registration logic
         # Constraint: User cannot register if already registered.
         
-        content = db.get_content_by_message_id(self.message_id)
-        if not content:
-            await interaction.response.send_message("❌ Bu içerik aktif değil.", ephemeral=True)
-            return
-
-        signups = content['signups']
         user_id = interaction.user.id
         role_text = self.role_input.value
-        
-        # Check duplicate
-        if any(s['user_id'] == user_id for s in signups):
-            await interaction.response.send_message("❌ Zaten kaydınız var. Önce kaydı silin.", ephemeral=True)
+        error = None
+
+        async with content_locks.hold(self.message_id):
+            content = await db.get_content_by_message_id(self.message_id)
+            if not content:
+                error = "❌ Bu içerik aktif değil."
+            # Check duplicate (the unique index on content_signups is the final guard)
+            elif any(s['user_id'] == user_id for s in content['signups']) \
+                    or not await db.add_signup(content['id'], user_id, interaction.user.display_name, role_text):
+                error = "❌ Zaten kaydınız var. Önce kaydı silin."
+
+        if error:
+            await interaction.response.send_message(error, ephemeral=True)
             return
 
-        await interaction.response.defer(ephemeral=True)
-
-        signups.append({
-            'user_id': user_id,
-            'name': interaction.user.display_name,
-            'role': role_text
-        })
-        msg = f"✅ Kaydınız alındı: **{role_text}**"
-
-        db.update_content_signups(self.message_id, signups)
+        await interaction.response.send_message(f"✅ Kaydınız alındı: **{role_text}**", ephemeral=True)
         await ContentView.update_embed(interaction, self.message_id)
-        await interaction.followup.send(msg, ephemeral=True)
 
 class TemplateModal(discord.ui.Modal, title="Albion Tablo Şablonu"):
     roles_input = discord.ui.TextInput(
@@ -76,7 +80,7 @@ class TemplateModal(discord.ui.Modal, title="Albion Tablo Şablonu"):
             await interaction.response.send_message("❌ Geçerli bir liste girmediniz.", ephemeral=True)
             return
             
-        db.save_template(self.template_name, parsed_structure)
+        await db.save_template(self.template_name, parsed_structure)
         
         total_roles = sum(len(g) for g in parsed_structure)
         await interaction.response.send_message(f"✅ Tablo şablonu **{self.template_name}** kaydedildi ({len(parsed_structure)} Parti, {total_roles} Rol).", ephemeral=True)
@@ -98,7 +102,7 @@ class DescriptionModal(discord.ui.Modal, title="İçerik Açıklaması"):
         self.template_name = template_name
 
     async def on_submit(self, interaction: discord.Interaction):
-        template = db.get_template(self.template_name)
+        template = await db.get_template(self.template_name)
         if not template:
             await interaction.response.send_message("❌ Şablon bulunamadı.", ephemeral=True)
             return
@@ -106,7 +110,7 @@ class DescriptionModal(discord.ui.Modal, title="İçerik Açıklaması"):
         description = self.description_input.value or ""
         
         # Init Data
-        parties, flat_roles = ContentView.normalize_template(template['roles'])
+        parties, flat_roles = template['parties'], template['flat_roles']
         data = [[] for _ in flat_roles]
         
         # Create Embed
@@ -126,7 +130,7 @@ class DescriptionModal(discord.ui.Modal, title="İçerik Açıklaması"):
         msg = await interaction.original_response()
         
         # Save to DB - Returns New ID
-        new_id = db.create_content(msg.id, interaction.channel.id, self.name, self.template_name, data, description)
+        new_id = await db.create_content(msg.id, interaction.channel.id, self.name, self.template_name, data, description)
         
         # Update Embed with Real ID
         new_title = f"⚔️ {self.name} - {new_id}"
@@ -147,49 +151,24 @@ class ContentView(discord.ui.View):
     async def unregister_btn(self, interaction: discord.Interaction, button: discord.ui.Button):
         await interaction.response.defer(ephemeral=True)
         message_id = interaction.message.id
-        content = db.get_content_by_message_id(message_id)
+        async with content_locks.hold(message_id):
+            content = await db.get_content_by_message_id(message_id)
+            removed = content is not None and await db.remove_signup(content['id'], interaction.user.id)
         
         if not content:
             await interaction.followup.send("❌ İçerik bulunamadı.", ephemeral=True)
             return
 
-        signups = content['signups']
-        user_id = interaction.user.id
-        new_signups = [s for s in signups if s['user_id'] != user_id]
-        
-        if len(new_signups) == len(signups):
+        if not removed:
             await interaction.followup.send("⚠️ Zaten kaydınız yok.", ephemeral=True)
         else:
-            db.update_content_signups(message_id, new_signups)
             await ContentView.update_embed(interaction, message_id)
             await interaction.followup.send("✅ Kaydınız silindi.", ephemeral=True)
 
     @staticmethod
     def normalize_template(template_roles):
         """Returns (parties_list_of_lists, flat_roles_list)"""
-        if not template_roles:
-            return [], []
-            
-        # Check if legacy (list of strings/dicts) or new (list of lists)
-        first = template_roles[0]
-        parties = []
-        if isinstance(first, list):
-            parties = template_roles
-        else:
-            parties = [template_roles]
-            
-        # Flatten
-        flat = []
-        final_parties = []
-        for p in parties:
-            p_clean = []
-            for r in p:
-                name = r['name'] if isinstance(r, dict) else str(r)
-                p_clean.append(name)
-                flat.append(name)
-            final_parties.append(p_clean)
-            
-        return final_parties, flat
+        return normalize_template(template_roles)
 
     @staticmethod
     def generate_view_str(parties, assignments):
@@ -197,56 +176,16 @@ class ContentView(discord.ui.View):
         output_parts = []
         current_data_idx = 0
         
-        # ANSI Escape Codes
-        ANSI_RESET = "\u001b[0m"
-        ANSI_BOLD = "\u001b[1;37m"
-        ANSI_CYAN = "\u001b[0;36m"
-        ANSI_YELLOW = "\u001b[0;33m"
-        
         for i, party_roles in enumerate(parties):
             party_len = len(party_roles)
             party_data = assignments[current_data_idx : current_data_idx + party_len] if assignments else []
             current_data_idx += party_len
             
-            # Build Table For This Party
-            w_role = 15
-            w_player = 15
-            
-            # Width Calc
-            for ridx, r_name in enumerate(party_roles):
-                w_role = max(w_role, len(r_name))
-                users = party_data[ridx] if ridx < len(party_data) else []
-                u_str = ", ".join(users) if users else "-"
-                w_player = max(w_player, len(u_str))
-            
-            w_player = min(w_player, 30)
-            
-            # Header
-            h_role = f"{'ROLE':<{w_role}}"
-            h_player = f"{'PLAYER':<{w_player}}"
-            
-            header = f"{ANSI_BOLD}{h_role}{ANSI_RESET} | {ANSI_BOLD}{h_player}{ANSI_RESET}"
-            
-            # Separator based on visual width
-            total_width = w_role + 3 + w_player
-            sep = "-" * total_width
-            lines = [header, sep]
-            
-            for ridx, r_name in enumerate(party_roles):
-                users = party_data[ridx] if ridx < len(party_data) else []
-                u_str = ", ".join(users) if users else "-"
-                
-                d_role = (r_name[:w_role-2] + "..") if len(r_name) > w_role else r_name
-                d_player = (u_str[:w_player-2] + "..") if len(u_str) > w_player else u_str
-                
-                d_role_padded = f"{d_role:<{w_role}}"
-                d_player_padded = f"{d_player:<{w_player}}"
-                
-                c_player = ANSI_YELLOW if u_str != "-" else ANSI_RESET
-                
-                lines.append(f"{ANSI_CYAN}{d_role_padded}{ANSI_RESET} | {c_player}{d_player_padded}{ANSI_RESET}")
-            
-            table_body = "\n".join(lines)
+            # Unchanged parties hit the render cache; only the edited one is rebuilt
+            table_body = ContentView._render_party(
+                tuple(party_roles),
+                tuple(tuple(users) for users in party_data)
+            )
             
             if len(parties) > 1:
                 output_parts.append(f"**Parti {i+1}**\n```ansi\n{table_body}\n```")
@@ -255,9 +194,64 @@ class ContentView(discord.ui.View):
 
         return "\n".join(output_parts)
 
+    @staticmethod
+    @functools.lru_cache(maxsize=2048)
+    def _render_party(party_roles, party_data):
+        """Renders one party table. Arguments are tuples so the result can be memoized."""
+        # ANSI Escape Codes
+        ANSI_RESET = "\u001b[0m"
+        ANSI_BOLD = "\u001b[1;37m"
+        ANSI_CYAN = "\u001b[0;36m"
+        ANSI_YELLOW = "\u001b[0;33m"
+        
+        # Build Table For This Party
+        w_role = 15
+        w_player = 15
+        
+        # Width Calc
+        for ridx, r_name in enumerate(party_roles):
+            w_role = max(w_role, len(r_name))
+            users = party_data[ridx] if ridx < len(party_data) else []
+            u_str = ", ".join(users) if users else "-"
+            w_player = max(w_player, len(u_str))
+        
+        w_player = min(w_player, 30)
+        
+        # Header
+        h_role = f"{'ROLE':<{w_role}}"
+        h_player = f"{'PLAYER':<{w_player}}"
+        
+        header = f"{ANSI_BOLD}{h_role}{ANSI_RESET} | {ANSI_BOLD}{h_player}{ANSI_RESET}"
+        
+        # Separator based on visual width
+        total_width = w_role + 3 + w_player
+        sep = "-" * total_width
+        lines = [header, sep]
+        
+        for ridx, r_name in enumerate(party_roles):
+            users = party_data[ridx] if ridx < len(party_data) else []
+            u_str = ", ".join(users) if users else "-"
+            
+            d_role = (r_name[:w_role-2] + "..") if len(r_name) > w_role else r_name
+            d_player = (u_str[:w_player-2] + "..") if len(u_str) > w_player else u_str
+            
+            d_role_padded = f"{d_role:<{w_role}}"
+            d_player_padded = f"{d_player:<{w_player}}"
+            
+            c_player = ANSI_YELLOW if u_str != "-" else ANSI_RESET
+            
+            lines.append(f"{ANSI_CYAN}{d_role_padded}{ANSI_RESET} | {c_player}{d_player_padded}{ANSI_RESET}")
+        
+        return "\n".join(lines)
+
     @staticmethod
     async def update_embed(interaction: discord.Interaction, message_id: int):
-        content = db.get_content_by_message_id(message_id)
+        """Queues a refresh of the content post; edits are rate limited by embed_refresher."""
+        embed_refresher.schedule(message_id, lambda: ContentView._refresh_embed(interaction, message_id))
+
+    @staticmethod
+    async def _refresh_embed(interaction: discord.Interaction, message_id: int):
+        content = await db.get_content_by_message_id(message_id)
         if not content: return
         
         title = f"⚔️ {content['name']} - {content['id']}"
@@ -267,15 +261,14 @@ class ContentView(discord.ui.View):
         data = content['data']
         signups = content['signups']
         description = content.get('description', "")
-        template = db.get_template(content['template_name'])
+        template = await db.get_template(content['template_name'])
         
-        template_roles = template['roles'] if template else []
+        parties = template['parties'] if template else ()
         
-        if not template_roles and not data:
+        if not parties and not data:
              embed.description = "⚠️ Veri yok."
         else:
              try:
-                 parties, flat = ContentView.normalize_template(template_roles)
                  view_str = ContentView.generate_view_str(parties, data)
                  
                  full_desc = f"{description}\n\n{view_str}" if description else view_str
@@ -334,12 +327,12 @@ class Content(commands.Cog):
         if not ConfigManager.can_use_command(interaction.user, "content"):
              await interaction.response.send_message("⛔ Yetkiniz yok.", ephemeral=True)
              return
-        template = db.get_template(name)
+        template = await db.get_template(name)
         if not template:
             await interaction.response.send_message("❌ Şablon bulunamadı.", ephemeral=True)
             return
         
-        parties, flat = ContentView.normalize_template(template['roles'])
+        parties = template['parties']
         # Reconstruct text
         lines = [", ".join(p) for p in parties]
         
@@ -352,13 +345,13 @@ class Content(commands.Cog):
         if not ConfigManager.can_use_command(interaction.user, "content"):
              await interaction.response.send_message("⛔ Yetkiniz yok.", ephemeral=True)
              return
-        db.delete_template(name)
+        await db.delete_template(name)
         await interaction.response.send_message(f"✅ Şablon **{name}** silindi.", ephemeral=True)
 
     @template_edit.autocomplete('name')
     @template_remove.autocomplete('name')
     async def template_autocomplete(self, interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
-        templates = db.get_all_templates()
+        templates = await db.get_all_templates()
         return [app_commands.Choice(name=t, value=t) for t in templates if current.lower() in t.lower()][:25]
 
     @content_group.command(name="create", description="Yeni içerik oluştur")
@@ -369,7 +362,7 @@ class Content(commands.Cog):
              await interaction.response.send_message("⛔ Yetkiniz yok.", ephemeral=True)
              return
 
-        template = db.get_template(template_name)
+        template = await db.get_template(template_name)
         if not template:
             await interaction.response.send_message("❌ Şablon bulunamadı.", ephemeral=True)
             return
@@ -388,25 +381,36 @@ class Content(commands.Cog):
              await interaction.response.send_message("⛔ Yetkiniz yok.", ephemeral=True)
              return
 
-        content = self._resolve_content(interaction, content_ref)
+        content = await self._resolve_content(interaction, content_ref)
         if not content:
             await interaction.response.send_message("❌ İçerik bulunamadı.", ephemeral=True)
             return
 
-        template = db.get_template(content['template_name'])
+        async with content_locks.hold(content['message_id']):
+            msg, changed = await self._edit_slots(content['id'], role, player.strip())
+
+        if changed:
+            await ContentView.update_embed(interaction, content['message_id'])
+        await interaction.response.send_message(msg, ephemeral=True)
+
+    async def _edit_slots(self, content_id, role, entry):
+        """Assigns entry to the first free slot matching role, or clears them for "-". Returns (message, changed)."""
+        # Re-read under the content lock so concurrent edits see each other's changes
+        content = await db.get_content(content_id)
+        if not content:
+            return "❌ İçerik bulunamadı.", False
+
+        template = await db.get_template(content['template_name'])
         data = content['data']
         
-        entry = player.strip()
-        
         # Check duplicate
         if entry != "-" and entry:
              for slot_list in data:
                  if any(p.lower() == entry.lower() for p in slot_list):
-                      await interaction.response.send_message(f"❌ **{entry}** zaten tabloda bir role atanmış! Önce listeden çıkarmalısınız (/content kick).", ephemeral=True)
-                      return
+                      return f"❌ **{entry}** zaten tabloda bir role atanmış! Önce listeden çıkarmalısınız (/content kick).", False
 
         # Find matches
-        parties, flat_roles = ContentView.normalize_template(template['roles'])
+        flat_roles = template['flat_roles']
         
         matches = []
         for i, r_name in enumerate(flat_roles):
@@ -414,37 +418,24 @@ class Content(commands.Cog):
         matches.sort()
         
         if not matches:
-             await interaction.response.send_message("❌ Rol bulunamadı.", ephemeral=True)
-             return
+             return "❌ Rol bulunamadı.", False
 
         # Assign Logic
         if entry == "-" or not entry:
              count = 0
              for i in matches:
                  if i < len(data) and data[i]:
-                     data[i] = []
+                     await db.clear_slot(content['id'], i)
                      count += 1
-             msg = f"✅ Temizlendi: {count} slot."
-        else:
-             placed = False
-             for i in matches:
-                 if i < len(data):
-                     if not data[i]:
-                         data[i] = [entry]
-                         placed = True
-                         break
-             if placed: 
-                 msg = f"✅ Atandı: {entry} -> {role}"
-                 signups = content['signups']
-                 original_len = len(signups)
-                 new_signups = [s for s in signups if s['name'].lower() != entry.lower()]
-                 if len(new_signups) < original_len:
-                     db.update_content_signups(content['message_id'], new_signups)
-             else: msg = "⚠️ Slotlar dolu!"
-
-        db.update_content_data(content['message_id'], data)
-        await ContentView.update_embed(interaction, content['message_id'])
-        await interaction.response.send_message(msg, ephemeral=True)
+             return f"✅ Temizlendi: {count} slot.", count > 0
+
+        for i in matches:
+            if i < len(data):
+                if not data[i]:
+                    await db.assign_slot(content['id'], i, entry)
+                    await self._remove_signups_by_name(content, entry)
+                    return f"✅ Atandı: {entry} -> {role}", True
+        return "⚠️ Slotlar dolu!", False
 
     @content_group.command(name="unregister", description="Oyuncuyu tablodan (slotlardan) sil")
     @app_commands.describe(content_ref="İçerik", player="Tablodaki Oyuncu")
@@ -454,24 +445,23 @@ class Content(commands.Cog):
              await interaction.response.send_message("⛔ Yetkiniz yok.", ephemeral=True)
              return
 
-        content = self._resolve_content(interaction, content_ref)
+        content = await self._resolve_content(interaction, content_ref)
         if not content:
             await interaction.response.send_message("❌ İçerik bulunamadı.", ephemeral=True)
             return
 
-        data = content['data']
         entry = player.strip()
         removed_count = 0
         
-        for slot_list in data:
-            original_len = len(slot_list)
-            new_list = [p for p in slot_list if p.lower() != entry.lower()]
-            if len(new_list) < original_len:
-                slot_list[:] = new_list
-                removed_count += (original_len - len(new_list))
+        async with content_locks.hold(content['message_id']):
+            content = await db.get_content(content['id']) or content
+            for i, slot_list in enumerate(content['data']):
+                for p in slot_list:
+                    if p.lower() == entry.lower():
+                        if await db.remove_slot_player(content['id'], i, p):
+                            removed_count += 1
 
         if removed_count > 0:
-            db.update_content_data(content['message_id'], data)
             await ContentView.update_embed(interaction, content['message_id'])
             await interaction.response.send_message(f"✅ **{entry}** tablodan çıkarıldı.", ephemeral=True)
         else:
@@ -485,58 +475,54 @@ class Content(commands.Cog):
              await interaction.response.send_message("⛔ Yetkiniz yok.", ephemeral=True)
              return
 
-        content = self._resolve_content(interaction, content_ref)
+        content = await self._resolve_content(interaction, content_ref)
         if not content:
             await interaction.response.send_message("❌ İçerik bulunamadı.", ephemeral=True)
             return
 
+        async with content_locks.hold(content['message_id']):
+            msg, changed = await self._register_player(content['id'], role, player.strip())
+
+        if changed:
+            await ContentView.update_embed(interaction, content['message_id'])
+        await interaction.response.send_message(msg, ephemeral=True)
+
+    async def _register_player(self, content_id, role, entry):
+        """Places entry in the first empty slot matching role. Returns (message, changed)."""
+        # Re-read under the content lock so concurrent registrations see each other's changes
+        content = await db.get_content(content_id)
+        if not content:
+            return "❌ İçerik bulunamadı.", False
+
         # Direct Table Assignment Logic
-        template = db.get_template(content['template_name'])
+        template = await db.get_template(content['template_name'])
         data = content['data']
-        entry = player.strip()
 
         # Check if already in table
         for slot_list in data:
             if any(p.lower() == entry.lower() for p in slot_list):
-                 await interaction.response.send_message(f"❌ **{entry}** zaten tabloda!", ephemeral=True)
-                 return
+                 return f"❌ **{entry}** zaten tabloda!", False
 
         # Find Matches
-        parties, flat_roles = ContentView.normalize_template(template['roles'])
+        flat_roles = template['flat_roles']
         matches = []
         for i, r_name in enumerate(flat_roles):
              if role.lower() in r_name.lower(): matches.append(i)
         matches.sort()
 
         if not matches:
-             await interaction.response.send_message("❌ Rol bulunamadı.", ephemeral=True)
-             return
+             return "❌ Rol bulunamadı.", False
 
         # Try to place in first empty matching slot
-        placed = False
-        assigned_role_name = role
         for i in matches:
             if i < len(data):
                 if not data[i]: # Empty slot
-                    data[i] = [entry]
-                    placed = True
-                    assigned_role_name = flat_roles[i]
-                    break
-        
-        if placed:
-            db.update_content_data(content['message_id'], data)
-            
-            # Clean from signups if exists
-            signups = content['signups']
-            original_len = len(signups)
-            new_signups = [s for s in signups if s['name'].lower() != entry.lower()]
-            if len(new_signups) < original_len:
-                db.update_content_signups(content['message_id'], new_signups)
+                    await db.assign_slot(content['id'], i, entry)
+                    # Clean from signups if exists
+                    await self._remove_signups_by_name(content, entry)
+                    return f"✅ **{entry}** tabloya (**{flat_roles[i]}**) eklendi.", True
 
-            await ContentView.update_embed(interaction, content['message_id'])
-            await interaction.response.send_message(f"✅ **{entry}** tabloya (**{assigned_role_name}**) eklendi.", ephemeral=True)
-        else:
-            await interaction.response.send_message(f"⚠️ **{role}** için boş yer yok!", ephemeral=True)
+        return f"⚠️ **{role}** için boş yer yok!", False
 
     @content_group.command(name="kick", description="Oyuncuyu ön kayıt (bekleme) listesinden sil")
     @app_commands.describe(content_ref="İçerik", player="Listeden Oyuncu")
@@ -546,17 +532,16 @@ class Content(commands.Cog):
              await interaction.response.send_message("⛔ Yetkiniz yok.", ephemeral=True)
              return
 
-        content = self._resolve_content(interaction, content_ref)
+        content = await self._resolve_content(interaction, content_ref)
         if not content:
             await interaction.response.send_message("❌ İçerik bulunamadı.", ephemeral=True)
             return
 
-        signups = content['signups']
-        original_len = len(signups)
-        new_signups = [s for s in signups if s['name'].lower() != player.lower()]
+        async with content_locks.hold(content['message_id']):
+            content = await db.get_content(content['id']) or content
+            removed = await self._remove_signups_by_name(content, player)
         
-        if len(new_signups) < original_len:
-            db.update_content_signups(content['message_id'], new_signups)
+        if removed:
             await ContentView.update_embed(interaction, content['message_id'])
             await interaction.response.send_message(f"✅ **{player}** ön kayıt listesinden silindi.", ephemeral=True)
         else:
@@ -569,31 +554,40 @@ class Content(commands.Cog):
              await interaction.response.send_message("⛔ Yetkiniz yok.", ephemeral=True)
              return
         
-        content = self._resolve_content(interaction, content_ref)
+        content = await self._resolve_content(interaction, content_ref)
         if not content:
              await interaction.response.send_message("❌ İçerik çözümlenemedi.", ephemeral=True)
              return
              
-        db.delete_content(content['id'])
+        async with content_locks.hold(content['message_id']):
+            await db.delete_content(content['id'])
         await interaction.response.send_message(f"✅ İçerik (ID: {content['id']}) veritabanından silindi.", ephemeral=True)
 
-    def _resolve_content(self, interaction, content_ref):
+    async def _remove_signups_by_name(self, content, name):
+        """Drops every waiting-list entry whose name matches (case-insensitive). Returns the count."""
+        removed = 0
+        for s in content['signups']:
+            if s['name'].lower() == name.lower():
+                if await db.remove_signup(content['id'], s['user_id']):
+                    removed += 1
+        return removed
+
+    async def _resolve_content(self, interaction, content_ref):
         if content_ref.isdigit():
-             return db.get_content(int(content_ref))
+             return await db.get_content(int(content_ref))
         
-        actives = db.get_active_contents_by_channel(interaction.channel_id)
-        match = next((c for c in actives if c['name'] == content_ref), None)
-        if match: return match
+        content_id = await db.find_content_id_by_name(interaction.channel_id, content_ref)
+        if content_id is not None: return await db.get_content(content_id)
         
         if " - " in content_ref:
-             try: return db.get_content(int(content_ref.split(" - ")[-1]))
+             try: return await db.get_content(int(content_ref.split(" - ")[-1]))
              except: pass
         return None
 
     # Autocompletes
     @create.autocomplete('template_name')
     async def template_ac(self, interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
-        templates = db.get_all_templates()
+        templates = await db.get_all_templates()
         return [app_commands.Choice(name=t, value=t) for t in templates if current.lower() in t.lower()][:25]
 
     @edit.autocomplete('content_ref')
@@ -602,14 +596,9 @@ class Content(commands.Cog):
     @unregister.autocomplete('content_ref')
     @register.autocomplete('content_ref')
     async def content_ac(self, interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
-        actives = db.get_active_contents_by_channel(interaction.channel_id)
-        choices = []
-        for c in actives:
-            # Format: "Name - ID"
-            display = f"{c['name']} - {c['id']}"
-            if current.lower() in display.lower():
-                choices.append(app_commands.Choice(name=display, value=str(c['id'])))
-        return choices[:25]
+        matches = await db.search_contents(interaction.channel_id, current)
+        # Format: "Name - ID"
+        return [app_commands.Choice(name=f"{name} - {content_id}", value=str(content_id)) for content_id, name in matches]
 
     @edit.autocomplete('role')
     @register.autocomplete('role')
@@ -618,12 +607,11 @@ class Content(commands.Cog):
         roles = []
         
         if content_ref:
-             content = self._resolve_content(interaction, content_ref)
+             content = await self._resolve_content(interaction, content_ref)
              if content:
-                 t = db.get_template(content['template_name'])
+                 t = await db.get_template(content['template_name'])
                  if t:
-                     _, flat = ContentView.normalize_template(t['roles'])
-                     roles = flat
+                     roles = t['flat_roles']
         
         return [app_commands.Choice(name=r, value=r) for r in roles if current.lower() in r.lower()][:25]
 
@@ -635,7 +623,7 @@ class Content(commands.Cog):
         players = []
         
         if content_ref:
-             content = self._resolve_content(interaction, content_ref)
+             content = await self._resolve_content(interaction, content_ref)
              if content:
                  for s in content['signups']:
                      players.append(s['name']) 
@@ -649,7 +637,7 @@ class Content(commands.Cog):
         players = set()
         
         if content_ref:
-             content = self._resolve_content(interaction, content_ref)
+             content = await self._resolve_content(interaction, content_ref)
              if content:
                  data = content['data'] # List of lists
                  for slot_list in data:
@@ -663,5 +651,9 @@ class Content(commands.Cog):
         # Persistent Views only
         self.bot.add_view(ContentView(None))
 
+    async def cog_unload(self):
+        # Pending embed refreshes would query the database after it is closed
+        await embed_refresher.stop()
+
 async def setup(bot):
     await bot.add_cog(Content(bot))
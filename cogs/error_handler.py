@@ -1,16 +1,18 @@
 import discord
 from discord import app_commands
 from discord.ext import commands
-import traceback
 import sys
-import os
-from datetime import datetime
+from utils.metrics import metrics
+from utils.crash_reports import CrashReporter
 
 class ErrorHandler(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        if not os.path.exists('crash'):
-            os.makedirs('crash')
+        # One file per distinct error (crash/report_<fingerprint>.log), written off the event loop
+        self.reporter = CrashReporter('crash')
+
+    async def cog_unload(self):
+        await self.reporter.flush()
 
     @commands.Cog.listener()
     async def on_command_error(self, ctx, error):
@@ -44,10 +46,8 @@ class ErrorHandler(commands.Cog):
         if isinstance(error, (commands.CommandNotFound, app_commands.CommandNotFound)):
             return
 
-        # Prepare log content
-        timestamp_str = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        filename = f"crash/report_{timestamp_str}.log"
-        
+        metrics.count_error(error)
+
         details = {}
         respond = None
         
@@ -62,32 +62,8 @@ class ErrorHandler(commands.Cog):
             details = self._get_ctx_details(source)
             respond = source.send
 
-        # format traceback
-        tb_lines = traceback.format_exception(type(error), error, error.__traceback__)
-        tb_text = "".join(tb_lines)
-        
-        log_content = f"""
-ERROR REPORT - {timestamp_str}
-========================================
-User: {details.get('user')}
-Command: {details.get('command')}
-Channel: {details.get('channel')}
-Error Type: {type(error).__name__}
-Error Message: {str(error)}
-
-FULL TRACEBACK:
-----------------------------------------
-{tb_text}
-========================================
-        """
-        
-        # Save to file
-        try:
-            with open(filename, "w", encoding="utf-8") as f:
-                f.write(log_content)
-            print(f"Error logged to {filename}")
-        except Exception as e:
-            print(f"Failed to save crash log: {e}")
+        # Repeats of the same error only bump the report's counter
+        filename = self.reporter.report(error, details)
             
         # Notify user (Ephemeral if possible)
         error_msg = f"❌ **Beklenmeyen bir hata oluştu!**\nSistem yöneticisine şu rapor ID'sini iletin: `{filename}`"
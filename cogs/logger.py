@@ -1,15 +1,45 @@
+import asyncio
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands
 import json
 import math
-from datetime import timezone
+from datetime import datetime, timedelta, timezone
 from utils.database import db
+from utils.config import ConfigManager
 
 class Logger(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
+    async def cog_load(self):
+        self.archive_old_logs.start()
+
+    async def cog_unload(self):
+        # Wait for the cancelled run to finish so no archive batch is queued after shutdown
+        task = self.archive_old_logs.get_task()
+        self.archive_old_logs.cancel()
+        if task is not None:
+            await asyncio.gather(task, return_exceptions=True)
+
+    @tasks.loop(minutes=60)
+    async def archive_old_logs(self):
+        """Log retention: moves logs older than log_retention.days (config.yml) to the archive database."""
+        settings = ConfigManager.get_log_retention()
+        if not settings:
+            return
+        if self.archive_old_logs.minutes != settings['interval_minutes']:
+            self.archive_old_logs.change_interval(minutes=settings['interval_minutes'])
+
+        cutoff = datetime.now() - timedelta(days=settings['days'])
+        try:
+            moved = await db.archive_logs_older_than(cutoff, settings['archive'], settings['batch_size'])
+        except Exception as e:
+            print(f"Log arşivleme hatası: {e}")
+            return
+        if moved:
+            print(f"{moved} log kaydı arşive taşındı ({settings['archive']}).")
+
     @app_commands.command(name="showlog", description="Log kayıtlarını görüntüler.")
     @app_commands.describe(
         log_id="Görüntülemek istediğiniz log ID (boş bırakırsanız liste görüntülenir)"
@@ -19,11 +49,45 @@ class Logger(commands.Cog):
             # Show specific log
             await self.show_log_details(interaction, log_id)
         else:
-            # Show list (default page 1)
-            await self.show_log_list(interaction, 1)
+            # Show list (always starts at the newest page)
+            await self.show_log_list(interaction)
+
+    @app_commands.command(name="logstats", description="Komutların kullanım ve süre istatistiklerini gösterir.")
+    @app_commands.describe(hours="Kaç saatlik dönem (varsayılan: 24)")
+    async def logstats(self, interaction: discord.Interaction, hours: app_commands.Range[int, 1, 8760] = 24):
+        user = interaction.user
+        if not isinstance(user, discord.Member):
+            user = interaction.guild.get_member(user.id)
+
+        if not ConfigManager.can_use_command(user, "logstats"):
+            await interaction.response.send_message("⛔ Bu komutu kullanma yetkiniz yok.", ephemeral=True)
+            return
+
+        stats = await db.get_command_stats(datetime.now() - timedelta(hours=hours))
+
+        total = sum(s['count'] for s in stats)
+        failures = sum(s['failures'] for s in stats)
+        embed = discord.Embed(
+            title="📈 Komut İstatistikleri",
+            description=f"Son {hours} saat • {total} çalıştırma • ❌ {failures}",
+            color=discord.Color.dark_grey()
+        )
+
+        if not stats:
+            embed.description += "\n\n*Bu dönemde log yok.*"
+        for s in stats[:25]:
+            fail_rate = s['failures'] / s['count'] * 100 if s['count'] else 0
+            embed.add_field(
+                name=f"{s['command']} ×{s['count']}",
+                value=f"p50 {s['p50_ms']:.0f} • p95 {s['p95_ms']:.0f} • p99 {s['p99_ms']:.0f} ms | "
+                      f"ort. {s['avg_ms']:.0f} ms | ❌ %{fail_rate:.1f}",
+                inline=False
+            )
+
+        await interaction.response.send_message(embed=embed)
 
     async def show_log_details(self, interaction: discord.Interaction, log_id: int):
-        log = db.get_log_by_id(log_id)
+        log = await db.get_log_by_id(log_id)
         if not log:
             await interaction.response.send_message(f"❌ Log ID #{log_id} bulunamadı.", ephemeral=True)
             return
@@ -64,9 +128,9 @@ class Logger(commands.Cog):
         
         await interaction.response.send_message(embed=embed)
 
-    async def show_log_list(self, interaction: discord.Interaction, page: int):
+    async def show_log_list(self, interaction: discord.Interaction):
         ITEMS_PER_PAGE = 10
-        total_logs = db.get_total_log_count()
+        total_logs = await db.get_total_log_count()
         max_pages = math.ceil(total_logs / ITEMS_PER_PAGE)
         
         # Kullanıcı isteği: Max 20 sayfa
@@ -76,11 +140,8 @@ class Logger(commands.Cog):
         if max_pages == 0:
             max_pages = 1
             
-        if page < 1 or page > max_pages:
-             page = 1
-
-        offset = (page - 1) * ITEMS_PER_PAGE
-        logs = db.get_logs(ITEMS_PER_PAGE, offset)
+        page = 1
+        logs = await db.get_logs(ITEMS_PER_PAGE)
         
         embed = discord.Embed(title="📜 Komut Logları", description=f"Sayfa {page}/{max_pages}", color=discord.Color.dark_grey())
         
@@ -110,7 +171,7 @@ class Logger(commands.Cog):
                 )
 
         # View for pagination
-        view = PaginationView(page, max_pages) if max_pages > 1 else discord.utils.MISSING
+        view = PaginationView(page, max_pages, (logs[-1]['timestamp'], logs[-1]['id'])) if max_pages > 1 else discord.utils.MISSING
         
         if not interaction.response.is_done():
             await interaction.response.send_message(embed=embed, view=view)
@@ -119,10 +180,13 @@ class Logger(commands.Cog):
 
 
 class PaginationView(discord.ui.View):
-    def __init__(self, current_page, max_pages):
+    def __init__(self, current_page, max_pages, next_cursor):
         super().__init__(timeout=60)
         self.current_page = current_page
         self.max_pages = max_pages
+        # Keyset pagination: page N lists the logs older than page_cursors[N-1] (None = newest).
+        # Cursors are (timestamp, id) pairs, not ids, so archiving a row doesn't end the listing.
+        self.page_cursors = [None, next_cursor]
         
         # Update buttons state
         self.update_buttons()
@@ -153,8 +217,10 @@ class PaginationView(discord.ui.View):
 
     async def update_message(self, interaction: discord.Interaction):
         ITEMS_PER_PAGE = 10
-        offset = (self.current_page - 1) * ITEMS_PER_PAGE
-        logs = db.get_logs(ITEMS_PER_PAGE, offset)
+        before = self.page_cursors[self.current_page - 1]
+        logs = await db.get_logs(ITEMS_PER_PAGE, before)
+        if logs and len(self.page_cursors) == self.current_page:
+            self.page_cursors.append((logs[-1]['timestamp'], logs[-1]['id']))
         
         embed = discord.Embed(title="📜 Komut Logları", description=f"Sayfa {self.current_page}/{self.max_pages}", color=discord.Color.dark_grey())
         
@@ -17,9 +17,75 @@ DANGEROUS_PERMISSIONS = [
     "manage_expressions"
 ]
 
+def dangerous_permissions(perms: discord.Permissions) -> list[str]:
+    return [p_name for p_name in DANGEROUS_PERMISSIONS if getattr(perms, p_name, False)]
+
 class Split(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        # guild_id -> {role_id: (lowercase name, name)} of roles the command may delete.
+        # Built on first autocomplete, then kept current by the role events below.
+        self._splittable_roles = {}
+
+    # --- Splittable role index ---
+
+    @staticmethod
+    def _is_splittable(role: discord.Role) -> bool:
+        if role.is_default(): return False # @everyone
+        if role.managed: return False # Bot integration roles
+        if dangerous_permissions(role.permissions): return False
+        me = role.guild.me
+        return me is not None and role.position < me.top_role.position
+
+    def _get_index(self, guild: discord.Guild) -> dict:
+        index = self._splittable_roles.get(guild.id)
+        if index is None:
+            index = {
+                role.id: (role.name.lower(), role.name)
+                for role in guild.roles if self._is_splittable(role)
+            }
+            self._splittable_roles[guild.id] = index
+        return index
+
+    def _update_role(self, role: discord.Role):
+        index = self._splittable_roles.get(role.guild.id)
+        if index is None:
+            return
+        if self._is_splittable(role):
+            index[role.id] = (role.name.lower(), role.name)
+        else:
+            index.pop(role.id, None)
+
+    def _invalidate(self, guild: discord.Guild):
+        self._splittable_roles.pop(guild.id, None)
+
+    @commands.Cog.listener()
+    async def on_guild_role_create(self, role: discord.Role):
+        self._update_role(role)
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role: discord.Role):
+        index = self._splittable_roles.get(role.guild.id)
+        if index is not None:
+            index.pop(role.id, None)
+
+    @commands.Cog.listener()
+    async def on_guild_role_update(self, before: discord.Role, after: discord.Role):
+        # Reordering (or changing the bot's own top role) can affect every other role's eligibility
+        me = after.guild.me
+        if before.position != after.position or (me is not None and after == me.top_role):
+            self._invalidate(after.guild)
+        else:
+            self._update_role(after)
+
+    @commands.Cog.listener()
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        if after.id == self.bot.user.id and before.roles != after.roles:
+            self._invalidate(after.guild)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        self._invalidate(guild)
 
     @app_commands.command(name="splitcomplate", description="Split işlemini tamamlar ve ilgili rolü temizler.")
     @app_commands.describe(role_input="Silinecek rolü seçin (Yalnızca güvenli roller listelenir)")
@@ -59,10 +125,7 @@ class Split(commands.Cog):
             return {"status": "ABORTED", "reason": "Target role is admin"}
 
         # Check dangerous permissions
-        dangerous_found = []
-        for p_name in DANGEROUS_PERMISSIONS:
-            if getattr(perms, p_name, False):
-                dangerous_found.append(p_name)
+        dangerous_found = dangerous_permissions(perms)
         
         if dangerous_found:
              d_list = ", ".join(dangerous_found)
@@ -91,31 +154,13 @@ class Split(commands.Cog):
 
     @splitcomplete.autocomplete('role_input')
     async def splitcomplete_autocomplete(self, interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
-        roles = interaction.guild.roles
         choices = []
-        
         current_lower = current.lower()
         
-        for role in roles:
-            # Basic filters
-            if role.is_default(): continue # @everyone
-            if role.managed: continue # Bot integration roles
-            
-            # Permission filters
-            perms = role.permissions
-            if perms.administrator: continue
-            
-            # Check dangerous perms
-            is_dangerous = False
-            for p_name in DANGEROUS_PERMISSIONS:
-                 if getattr(perms, p_name, False):
-                     is_dangerous = True
-                     break
-            if is_dangerous: continue
-            
+        for role_id, (name_lower, name) in self._get_index(interaction.guild).items():
             # Match current input
-            if current_lower in role.name.lower():
-                choices.append(app_commands.Choice(name=role.name, value=str(role.id)))
+            if current_lower in name_lower:
+                choices.append(app_commands.Choice(name=name, value=str(role_id)))
                 if len(choices) >= 25: break
         
         return choices
@@ -0,0 +1,70 @@
+import discord
+from discord.ext import commands
+from discord import app_commands
+from utils.config import ConfigManager
+from utils.metrics import metrics, Metrics
+
+def _fmt(value):
+    if value is None:
+        return "-"
+    return f"{value:.1f}" if value < 10 else f"{value:.0f}"
+
+def _latency_line(h):
+    return f"p50 {_fmt(h.percentile(0.5))} • p95 {_fmt(h.percentile(0.95))} • p99 {_fmt(h.percentile(0.99))} ms"
+
+class Stats(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+
+    @app_commands.command(name="stats", description="Botun canlı performans metriklerini gösterir.")
+    async def stats(self, interaction: discord.Interaction):
+        user = interaction.user
+        if not isinstance(user, discord.Member):
+            user = interaction.guild.get_member(user.id)
+
+        if not ConfigManager.can_use_command(user, "stats"):
+            await interaction.response.send_message("⛔ Bu komutu kullanma yetkiniz yok.", ephemeral=True)
+            return
+
+        snap = metrics.snapshot()
+        hours, rest = divmod(int(snap['uptime']), 3600)
+        embed = discord.Embed(title="📊 Bot Metrikleri", description=f"Çalışma süresi: {hours} sa {rest // 60} dk", color=discord.Color.teal())
+
+        # Busiest commands first
+        lines = []
+        for name, h in sorted(snap['commands'].items(), key=lambda kv: kv[1].count, reverse=True)[:10]:
+            failures = snap['command_failures'].get(name, 0)
+            lines.append(f"`{name}` ×{h.count} • {_latency_line(h)}" + (f" • ❌ {failures}" if failures else ""))
+        embed.add_field(name="Komutlar", value="\n".join(lines)[:1024] or "*Henüz komut çalıştırılmadı*", inline=False)
+
+        db_total = Metrics.merged(snap['db'].values())
+        db_text = f"{db_total.count} çağrı • {_latency_line(db_total)}"
+        if snap['db']:
+            slowest, h = max(snap['db'].items(), key=lambda kv: kv[1].percentile(0.95) or 0)
+            db_text += f"\nEn yavaş: `{slowest}` (p95 {_fmt(h.percentile(0.95))} ms)"
+        embed.add_field(name="Veritabanı", value=db_text, inline=False)
+
+        http_total = Metrics.merged(snap['http'].values())
+        rate_limited = snap['http_statuses'].get(429, 0)
+        server_errors = sum(c for s, c in snap['http_statuses'].items() if s >= 500)
+        embed.add_field(
+            name="Discord HTTP",
+            value=f"{http_total.count} istek • {_latency_line(http_total)}\n"
+                  f"429: {rate_limited} • 5xx: {server_errors} • Bağlantı hatası: {snap['http_exceptions']}",
+            inline=False
+        )
+
+        lag = snap['loop_lag']
+        lag_text = f"Son: {snap['loop_lag_last']:.1f} ms • p99 {_fmt(lag.percentile(0.99))} ms • Maks: {lag.max:.0f} ms"
+        if snap['loop_blocks']:
+            location, count = max(snap['loop_blocks'].items(), key=lambda kv: kv[1])
+            lag_text += f"\nBloke: {sum(snap['loop_blocks'].values())} kez • En sık: `{location}` ×{count}"
+        embed.add_field(name="Olay Döngüsü Gecikmesi", value=lag_text, inline=False)
+
+        errors = ", ".join(f"`{name}` ×{count}" for name, count in sorted(snap['errors'].items(), key=lambda kv: -kv[1]))
+        embed.add_field(name="Hatalar", value=errors or "Yok", inline=False)
+
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+async def setup(bot):
+    await bot.add_cog(Stats(bot))
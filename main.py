@@ -1,8 +1,14 @@
 import discord
 import os
 import asyncio
+import time
 from discord.ext import commands
 from dotenv import load_dotenv
+from utils.database import db
+from utils.config import ConfigManager
+from utils.metrics import metrics
+from utils.watchdog import LoopWatchdog
+from utils.command_sync import CommandSyncState, tree_hash
 
 # .env dosyasındaki değişkenleri yükle
 load_dotenv()
@@ -10,6 +16,19 @@ load_dotenv()
 # TOKEN'ı al
 TOKEN = os.getenv('DISCORD_TOKEN')
 
+# Prometheus metrikleri için yerel port (boşsa endpoint açılmaz; /stats her zaman çalışır)
+METRICS_PORT = os.getenv('METRICS_PORT')
+METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+
+# Olay döngüsünü bloke eden kodu yakalayan izleyici (LOOP_WATCHDOG=1 ile açılır)
+LOOP_WATCHDOG = os.getenv('LOOP_WATCHDOG', '').lower() in ('1', 'true', 'yes')
+LOOP_WATCHDOG_MS = float(os.getenv('LOOP_WATCHDOG_MS', '250'))
+
+# Geliştirme: komutları yalnızca bu sunucuya anında senkronize et (global yerine)
+DEV_GUILD_ID = os.getenv('DEV_GUILD_ID')
+# Komut ağacı değişmemiş olsa bile senkronize et
+FORCE_COMMAND_SYNC = os.getenv('FORCE_COMMAND_SYNC', '').lower() in ('1', 'true', 'yes')
+
 # Intent'leri ayarla (Botun çalışması için gerekli izinler)
 intents = discord.Intents.default()
 
@@ -20,28 +39,106 @@ class MyBot(commands.Bot):
         super().__init__(
             command_prefix='!', # Prefix gereklidir ancak message_content kapalı olduğu için çalışmaz (Slash-only)
             intents=intents,
-            help_command=None
+            help_command=None,
+            http_trace=metrics.trace_config() # Discord HTTP süreleri
         )
+        self.watchdog = LoopWatchdog(LOOP_WATCHDOG_MS) if LOOP_WATCHDOG else None
 
     async def setup_hook(self):
+        started = time.perf_counter()
+        timings = [] # (adım, açıklama)
+
+        # Veritabanı şemasını DB iş parçacığında hazırla; aşağıdaki başlatma adımlarıyla paralel ilerler.
+        # Sonradan gelen sorgular bu işin arkasında sıraya girer.
+        db_init = db.init()
+
+        # config.yml değişikliklerini arka planda takip et (yeniden başlatma gerekmez)
+        ConfigManager.start_watcher()
+
+        # Metrikler: olay döngüsü gecikmesi ve (istenirse) /metrics endpoint'i
+        metrics.start_loop_monitor()
+        if METRICS_PORT:
+            try:
+                await metrics.start_http_server(int(METRICS_PORT), METRICS_HOST)
+                print(f"Metrikler: http://{METRICS_HOST}:{METRICS_PORT}/metrics")
+            except Exception as e:
+                print(f"Metrik sunucusu başlatılamadı: {e}")
+
+        if self.watchdog:
+            self.watchdog.start()
+            print(f"Olay döngüsü izleyicisi açık (eşik: {LOOP_WATCHDOG_MS:.0f} ms)")
+
         # Cogları (eklenti/modülleri) yükle
-        # cogs klasöründeki her .py dosyasını yükler
-        if os.path.exists('./cogs'):
-            for filename in os.listdir('./cogs'):
-                if filename.endswith('.py'):
-                    try:
-                        await self.load_extension(f'cogs.{filename[:-3]}')
-                        print(f'Yüklendi: {filename}')
-                    except Exception as e:
-                        print(f'Yüklenemedi: {filename}. Hata: {e}')
-        
-        # Slash komutlarını senkronize et (opsiyonel ama önerilir)
+        await self.load_cogs(db_init, timings)
+
+        step = time.perf_counter()
+        await self.sync_commands()
+        timings.append(("komut senkronizasyonu", f"{(time.perf_counter() - step) * 1000:.0f} ms"))
+
+        print(f"Başlangıç süreleri (toplam {(time.perf_counter() - started) * 1000:.0f} ms):")
+        for name, text in timings:
+            print(f"  {name:<24} {text}")
+
+    async def load_cogs(self, db_init, timings):
+        """Veritabanı hazır olunca cogs klasöründeki her .py dosyasını eşzamanlı yükler."""
+        # Şema kurulamazsa (ör. başarısız bir geçiş) bot bu haliyle çalışamaz: başlangıcı durdur
+        try:
+            await db_init
+        except Exception as e:
+            print(f"Veritabanı hazırlanamadı, bot başlatılmıyor: {e}")
+            raise
+        timings.append(("veritabanı", f"{db.init_ms:.0f} ms"))
+
+        if not os.path.exists('./cogs'):
+            return
+        names = sorted(f'cogs.{filename[:-3]}' for filename in os.listdir('./cogs') if filename.endswith('.py'))
+
+        async def load(name):
+            start = time.perf_counter()
+            try:
+                await self.load_extension(name)
+                failed = False
+            except Exception as e:
+                print(f'Yüklenemedi: {name}. Hata: {e}')
+                failed = True
+            return (time.perf_counter() - start) * 1000, failed
+
+        results = await asyncio.gather(*(load(name) for name in names))
+        for name, (load_ms, failed) in zip(names, results):
+            # load_extension modülü kendisi çalıştırır: süre import ve setup toplamıdır
+            timings.append((name, f"yükleme {load_ms:.0f} ms" + (" (HATA)" if failed else "")))
+
+    async def sync_commands(self):
+        """Slash komutlarını yalnızca komut ağacı son senkronizasyondan beri değiştiyse gönderir."""
+        guild = discord.Object(id=int(DEV_GUILD_ID)) if DEV_GUILD_ID else None
+        if guild:
+            self.tree.copy_global_to(guild=guild)
+
+        state = CommandSyncState()
+        scope = f"{self.application_id}:{guild.id if guild else 'global'}"
+        digest = tree_hash(self.tree, guild=guild)
+        if not FORCE_COMMAND_SYNC and state.is_current(scope, digest):
+            print("Slash komutları değişmedi, senkronizasyon atlandı.")
+            return
+
         try:
-            synced = await self.tree.sync()
-            print(f"{len(synced)} slash komutu senkronize edildi.")
+            synced = await self.tree.sync(guild=guild)
+            state.save(scope, digest)
+            target = f"sunucu {guild.id}" if guild else "global"
+            print(f"{len(synced)} slash komutu senkronize edildi ({target}).")
         except Exception as e:
             print(f"Komutlar senkronize edilemedi: {e}")
 
+    async def close(self):
+        # Coglar burada kaldırılır; ErrorHandler.cog_unload bekleyen hata raporlarını diske yazar
+        await super().close()
+        if self.watchdog:
+            self.watchdog.stop()
+        await metrics.stop()
+        # Bekleyen logları yaz; bağlantı, sıradaki sorgular bittikten sonra DB iş parçacığında kapanır
+        await db.log_writer.stop()
+        await db.connection.shutdown()
+
     async def on_ready(self):
         print(f'{self.user} olarak giriş yapıldı!')
         print(f'ID: {self.user.id}')
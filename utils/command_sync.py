@@ -0,0 +1,44 @@
+import hashlib
+import json
+import os
+from discord import app_commands
+
+STATE_PATH = ".command_tree_hash"
+
+def tree_hash(tree: app_commands.CommandTree, guild=None) -> str:
+    """
+    Stable hash of the payload tree.sync() would upload (names, descriptions, options,
+    groups, permissions...), so any change Discord needs to know about changes the hash.
+    """
+    payload = []
+    for command in tree.get_commands(guild=guild):
+        try:
+            payload.append(command.to_dict(tree))
+        except TypeError:
+            # discord.py < 2.4: to_dict() takes no tree
+            payload.append(command.to_dict())
+    payload.sort(key=lambda c: (c.get('type', 1), c['name']))
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+class CommandSyncState:
+    """Last synced tree hash per scope ("<application id>:global" or "<application id>:<guild id>")."""
+
+    def __init__(self, path: str = STATE_PATH):
+        self.path = path
+        self._hashes = {}
+        try:
+            with open(path, encoding="utf-8") as f:
+                self._hashes = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    def is_current(self, scope: str, digest: str) -> bool:
+        return self._hashes.get(scope) == digest
+
+    def save(self, scope: str, digest: str):
+        self._hashes[scope] = digest
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._hashes, f, indent=2)
+        os.replace(tmp_path, self.path)
@@ -1,56 +1,111 @@
 import yaml
 import os
+import threading
+import time
 import discord
 
 class ConfigManager:
     _config = {}
     _config_path = "config.yml"
+    # Compiled from _config: command name -> (allowed user IDs, allowed role IDs)
+    _permissions = {}
+    _mtime = None
+    _watcher = None
 
     @classmethod
     def load_config(cls):
         if not os.path.exists(cls._config_path):
             return {}
         try:
+            cls._mtime = os.stat(cls._config_path).st_mtime_ns
             with open(cls._config_path, 'r', encoding='utf-8') as f:
                 cls._config = yaml.safe_load(f) or {}
         except Exception as e:
             print(f"Config yükleme hatası: {e}")
             cls._config = {}
+        cls._permissions = cls._compile_permissions(cls._config)
         return cls._config
 
+    @staticmethod
+    def _compile_permissions(config):
+        permissions = {}
+        for command_name, cmd_config in (config.get("commands") or {}).items():
+            if not cmd_config:
+                continue
+            permissions[command_name] = (
+                frozenset(cmd_config.get("users", []) or []),
+                frozenset(cmd_config.get("roles", []) or [])
+            )
+        return permissions
+
+    @classmethod
+    def reload_if_changed(cls):
+        try:
+            mtime = os.stat(cls._config_path).st_mtime_ns
+        except OSError:
+            return
+        if mtime != cls._mtime:
+            cls.load_config()
+            print("config.yml yeniden yüklendi.")
+
+    @classmethod
+    def start_watcher(cls, interval: float = 2.0):
+        """
+        Polls config.yml's mtime on a background thread and reloads it when it changes,
+        so edits apply without a restart and permission checks never touch the disk.
+        """
+        if cls._watcher is not None:
+            return
+
+        def watch():
+            while True:
+                time.sleep(interval)
+                cls.reload_if_changed()
+
+        cls._watcher = threading.Thread(target=watch, name="config-watcher", daemon=True)
+        cls._watcher.start()
+
+    @classmethod
+    def get_log_retention(cls):
+        """
+        Returns the `log_retention` settings ({'days', 'batch_size', 'interval_minutes', 'archive'})
+        or None when retention is disabled (section missing or days <= 0).
+        """
+        section = cls._config.get("log_retention") or {}
+        days = section.get("days") or 0
+        if days <= 0:
+            return None
+        return {
+            "days": days,
+            "batch_size": section.get("batch_size") or 1000,
+            "interval_minutes": section.get("interval_minutes") or 60,
+            "archive": section.get("archive") or "archive.db",
+        }
+
     @classmethod
     def can_use_command(cls, user: discord.Member, command_name: str) -> bool:
         """
         Check if a user can use a specific command based on config.yml
         Checks both User ID and Role IDs.
         """
-        # Reload config every time to allow dynamic updates
-        cls.load_config()
-        
-        commands = cls._config.get("commands", {})
-        cmd_config = commands.get(command_name)
-        
-        if not cmd_config:
+        rule = cls._permissions.get(command_name)
+
+        if not rule:
             # If command not in config, assume restricted (or allow? usually restrict)
             # User request implies whitelist logic, so default deny.
             return False
 
+        allowed_users, allowed_roles = rule
+
         # Check User ID
-        allowed_users = cmd_config.get("users", []) or []
         if user.id in allowed_users:
             return True
 
         # Check Role IDs
-        allowed_roles = cmd_config.get("roles", []) or []
         if not allowed_roles:
             return False
-            
-        user_role_ids = [role.id for role in user.roles]
-        # Check intersection
-        if any(r_id in user_role_ids for r_id in allowed_roles):
-            return True
 
-        return False
+        return any(role.id in allowed_roles for role in user.roles)
 
 # Initialize
 ConfigManager.load_config()
@@ -0,0 +1,163 @@
+import asyncio
+import glob
+import hashlib
+import os
+import threading
+import time
+import traceback
+from collections import OrderedDict
+from datetime import datetime
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+class CrashReporter:
+    """
+    Writes one crash report file per distinct error.
+
+    Errors are fingerprinted by exception type and traceback frames, so an error storm
+    updates a single file (occurrence count, first/last seen) instead of creating one per
+    failure. A fingerprint's file is rewritten at most every `min_write_interval` seconds;
+    writes happen on a worker thread, and only the newest `max_reports` files are kept.
+    """
+
+    def __init__(self, directory="crash", max_reports=50, min_write_interval=10.0):
+        self.directory = directory
+        self.max_reports = max_reports
+        self.min_write_interval = min_write_interval
+        os.makedirs(directory, exist_ok=True)
+
+        self._entries = OrderedDict() # fingerprint -> entry, least recently seen first
+        self._pending = set()
+        # Writer thread only: fingerprint -> (count, first seen) already in the file before
+        # this process started tracking it, so counters continue across restarts
+        self._base = {}
+        self._written = {} # fingerprint -> last_seen of the newest snapshot on disk
+        self._write_lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(error: BaseException) -> str:
+        parts = [f"{type(error).__module__}.{type(error).__qualname__}"]
+        for frame in traceback.extract_tb(error.__traceback__):
+            parts.append(f"{os.path.basename(frame.filename)}:{frame.name}:{frame.lineno}")
+        return hashlib.sha1("|".join(parts).encode()).hexdigest()[:12]
+
+    def path_for(self, fingerprint: str) -> str:
+        return os.path.join(self.directory, f"report_{fingerprint}.log")
+
+    def report(self, error: BaseException, details: dict) -> str:
+        """Records one occurrence and returns the report file path. Cheap enough for the event loop."""
+        fp = self.fingerprint(error)
+        now = time.time()
+
+        entry = self._entries.get(fp)
+        if entry is None:
+            entry = self._entries[fp] = {
+                'fingerprint': fp,
+                'count': 0,
+                'first_seen': now,
+                'last_written': 0.0,
+                'traceback': "".join(traceback.format_exception(type(error), error, error.__traceback__)),
+                'error_type': type(error).__name__,
+            }
+            while len(self._entries) > self.max_reports:
+                self._entries.popitem(last=False)
+        self._entries.move_to_end(fp)
+
+        entry['count'] += 1
+        entry['last_seen'] = now
+        entry['message'] = str(error)
+        entry['details'] = details
+
+        if now - entry['last_written'] >= self.min_write_interval:
+            first_write = entry['last_written'] == 0.0
+            entry['last_written'] = now
+            self._schedule_write({**entry, 'first_write': first_write})
+        return self.path_for(fp)
+
+    def _schedule_write(self, entry):
+        task = asyncio.get_running_loop().create_task(asyncio.to_thread(self._write, entry))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def flush(self):
+        """Writes every report with occurrences not yet on disk (throttled ones) and waits for pending writes."""
+        for entry in self._entries.values():
+            if entry['last_seen'] > entry['last_written']:
+                entry['last_written'] = entry['last_seen']
+                self._schedule_write({**entry, 'first_write': False})
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+
+    def _write(self, entry):
+        """Runs on a worker thread."""
+        path = self.path_for(entry['fingerprint'])
+        with self._write_lock:
+            try:
+                fp = entry['fingerprint']
+                if entry['first_write'] or fp not in self._base:
+                    self._base[fp] = self._read_header(path) or (0, entry['first_seen'])
+                if self._written.get(fp, 0.0) > entry['last_seen']:
+                    return # A newer snapshot already reached the disk
+                self._written[fp] = entry['last_seen']
+
+                base_count, base_first_seen = self._base[fp]
+                count = base_count + entry['count']
+                first_seen = min(base_first_seen, entry['first_seen'])
+
+                details = entry['details']
+                content = f"""
+ERROR REPORT - {entry['fingerprint']}
+========================================
+Occurrences: {count}
+First Seen: {datetime.fromtimestamp(first_seen).strftime(TIME_FORMAT)}
+Last Seen: {datetime.fromtimestamp(entry['last_seen']).strftime(TIME_FORMAT)}
+
+Last occurrence:
+User: {details.get('user')}
+Command: {details.get('command')}
+Channel: {details.get('channel')}
+Error Type: {entry['error_type']}
+Error Message: {entry['message']}
+
+FULL TRACEBACK:
+----------------------------------------
+{entry['traceback']}
+========================================
+"""
+                tmp_path = path + ".tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write(content)
+                os.replace(tmp_path, path)
+                if entry['first_write']:
+                    print(f"Error logged to {path} (x{count})")
+                self._prune()
+            except Exception as e:
+                print(f"Failed to save crash log: {e}")
+
+    @staticmethod
+    def _read_header(path):
+        """(occurrences, first seen timestamp) of an existing report, or None."""
+        try:
+            with open(path, encoding="utf-8") as f:
+                header = {}
+                for line in f:
+                    if line.startswith(("Occurrences:", "First Seen:")):
+                        key, value = line.split(":", 1)
+                        header[key] = value.strip()
+                    if len(header) == 2:
+                        break
+            return int(header["Occurrences"]), datetime.strptime(header["First Seen"], TIME_FORMAT).timestamp()
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def _prune(self):
+        """Keeps only the max_reports most recently written reports."""
+        reports = glob.glob(os.path.join(self.directory, "report_*.log"))
+        if len(reports) <= self.max_reports:
+            return
+        reports.sort(key=os.path.getmtime)
+        for old in reports[:-self.max_reports]:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
@@ -1,7 +1,11 @@
+import asyncio
+import time
 from utils.db.connection import DatabaseConnection
 from utils.db.repositories.logs import LogRepository
 from utils.db.repositories.templates import TemplateRepository
 from utils.db.repositories.contents import ContentRepository
+from utils.db.log_writer import LogWriter
+from utils.db.migrations import migrate
 
 class Database:
     _instance = None
@@ -15,65 +19,110 @@ class Database:
             cls._instance.logs = LogRepository(cls._instance.connection)
             cls._instance.templates = TemplateRepository(cls._instance.connection)
             cls._instance.contents = ContentRepository(cls._instance.connection)
-            
-            cls._instance._init_db()
+            cls._instance.log_writer = LogWriter(cls._instance.logs)
+            # The schema is created/upgraded by init(), not on import
+            cls._instance._init_future = None
+            cls._instance.init_ms = None
         return cls._instance
 
+    def init(self):
+        """
+        Opens the connection and applies pending schema migrations on the DB worker thread.
+        Returns an awaitable. The job is queued immediately, so queries issued after
+        this call run after it even if the caller has not awaited it yet.
+        """
+        if self._init_future is None:
+            loop = asyncio.get_running_loop()
+            self._init_future = loop.run_in_executor(self.connection.executor, self._init_db)
+        return self._init_future
+
     def _init_db(self):
-        # Delegate table creation
-        self.logs.init_table()
-        self.templates.init_table()
-        self.contents.init_table()
+        start = time.perf_counter()
+        # A single version check when the schema is already current
+        migrate(self.connection.get_connection())
+        self.init_ms = (time.perf_counter() - start) * 1000
 
     # --- Wrapped Methods for Backward Compatibility ---
+    # All of them are coroutines: queries run on the DB worker thread.
 
     # Logs
-    def log_command(self, *args, **kwargs):
-        return self.logs.log_command(*args, **kwargs)
+    async def log_command(self, *args, **kwargs):
+        return await self.logs.log_command(*args, **kwargs)
+
+    def enqueue_log(self, **kwargs):
+        # Buffered: written in batches by the background LogWriter task
+        self.log_writer.enqueue(**kwargs)
+
+    async def get_logs(self, *args, **kwargs):
+        return await self.logs.get_logs(*args, **kwargs)
+
+    async def get_log_details(self, *args, **kwargs):
+        return await self.logs.get_log_details(*args, **kwargs)
+
+    async def get_log_by_id(self, *args, **kwargs):
+        return await self.logs.get_log_by_id(*args, **kwargs)
 
-    def get_logs(self, *args, **kwargs):
-        return self.logs.get_logs(*args, **kwargs)
+    async def get_total_log_count(self, *args, **kwargs):
+        return await self.logs.get_total_log_count(*args, **kwargs)
 
-    def get_log_details(self, *args, **kwargs):
-        return self.logs.get_log_details(*args, **kwargs)
+    async def get_command_stats(self, *args, **kwargs):
+        return await self.logs.get_command_stats(*args, **kwargs)
+
+    async def archive_logs_older_than(self, *args, **kwargs):
+        return await self.logs.archive_older_than(*args, **kwargs)
 
     # Templates
-    def save_template(self, *args, **kwargs):
-        return self.templates.save_template(*args, **kwargs)
+    async def save_template(self, *args, **kwargs):
+        return await self.templates.save_template(*args, **kwargs)
 
-    def get_template(self, *args, **kwargs):
-        return self.templates.get_template(*args, **kwargs)
+    async def get_template(self, *args, **kwargs):
+        return await self.templates.get_template(*args, **kwargs)
 
-    def get_all_templates(self, *args, **kwargs):
-        return self.templates.get_all_templates(*args, **kwargs)
+    async def get_all_templates(self, *args, **kwargs):
+        return await self.templates.get_all_templates(*args, **kwargs)
 
-    def delete_template(self, *args, **kwargs):
-        return self.templates.delete_template(*args, **kwargs)
+    async def delete_template(self, *args, **kwargs):
+        return await self.templates.delete_template(*args, **kwargs)
 
     # Contents
-    def create_content(self, *args, **kwargs):
-        return self.contents.create_content(*args, **kwargs)
+    async def create_content(self, *args, **kwargs):
+        return await self.contents.create_content(*args, **kwargs)
     
-    def get_content(self, *args, **kwargs):
-        return self.contents.get_content(*args, **kwargs)
+    async def get_content(self, *args, **kwargs):
+        return await self.contents.get_content(*args, **kwargs)
+
+    async def get_content_by_message_id(self, *args, **kwargs):
+        return await self.contents.get_content_by_message_id(*args, **kwargs)
+
+    async def get_latest_content_by_channel(self, *args, **kwargs):
+        return await self.contents.get_latest_content_by_channel(*args, **kwargs)
+
+    async def get_active_contents_by_channel(self, *args, **kwargs):
+        return await self.contents.get_active_contents_by_channel(*args, **kwargs)
+
+    async def search_contents(self, *args, **kwargs):
+        return await self.contents.search_contents(*args, **kwargs)
+
+    async def find_content_id_by_name(self, *args, **kwargs):
+        return await self.contents.find_content_id_by_name(*args, **kwargs)
 
-    def get_content_by_message_id(self, *args, **kwargs):
-        return self.contents.get_content_by_message_id(*args, **kwargs)
+    async def add_signup(self, *args, **kwargs):
+        return await self.contents.add_signup(*args, **kwargs)
 
-    def get_latest_content_by_channel(self, *args, **kwargs):
-        return self.contents.get_latest_content_by_channel(*args, **kwargs)
+    async def remove_signup(self, *args, **kwargs):
+        return await self.contents.remove_signup(*args, **kwargs)
 
-    def get_active_contents_by_channel(self, *args, **kwargs):
-        return self.contents.get_active_contents_by_channel(*args, **kwargs)
+    async def assign_slot(self, *args, **kwargs):
+        return await self.contents.assign_slot(*args, **kwargs)
 
-    def update_content_data(self, *args, **kwargs):
-        return self.contents.update_content_data(*args, **kwargs)
+    async def clear_slot(self, *args, **kwargs):
+        return await self.contents.clear_slot(*args, **kwargs)
 
-    def update_content_signups(self, *args, **kwargs):
-        return self.contents.update_content_signups(*args, **kwargs)
+    async def remove_slot_player(self, *args, **kwargs):
+        return await self.contents.remove_slot_player(*args, **kwargs)
 
-    def delete_content(self, *args, **kwargs):
-        return self.contents.delete_content(*args, **kwargs)
+    async def delete_content(self, *args, **kwargs):
+        return await self.contents.delete_content(*args, **kwargs)
 
 # Singleton instance
 db = Database()
@@ -1,5 +1,17 @@
+import asyncio
+import functools
 import sqlite3
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from utils.metrics import metrics
+
+# Connection tuning, applied once when the long-lived connection is opened
+BUSY_TIMEOUT_MS = 5000
+CACHED_STATEMENTS = 256
+MMAP_SIZE = 256 * 1024 * 1024
+AUTO_VACUUM_INCREMENTAL = 2
 
 class DatabaseConnection:
     _instance = None
@@ -9,9 +21,89 @@ class DatabaseConnection:
             cls._instance = super(DatabaseConnection, cls).__new__(cls)
             base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
             cls._instance.db_path = os.path.join(base_dir, db_path)
+            # Every query runs on this single worker thread so SQLite I/O never blocks the event loop
+            cls._instance.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="db")
+            cls._instance._conn = None
+            cls._instance._conn_lock = threading.Lock()
+            cls._instance._closed = False
         return cls._instance
 
     def get_connection(self):
-        conn = sqlite3.connect(self.db_path, detect_types=sqlite3.PARSE_DECLTYPES)
+        """
+        Returns the shared long-lived connection, opening it on first use.
+        Repositories must not close it.
+        """
+        if self._conn is None:
+            with self._conn_lock:
+                if self._closed:
+                    raise sqlite3.ProgrammingError("Database connection has been shut down")
+                if self._conn is None:
+                    self._conn = self._open_connection()
+        return self._conn
+
+    def _open_connection(self):
+        # check_same_thread is off because the connection is created at startup and then
+        # used by the DB worker thread; the single-thread executor serializes all access.
+        conn = sqlite3.connect(
+            self.db_path,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            timeout=BUSY_TIMEOUT_MS / 1000,
+            cached_statements=CACHED_STATEMENTS,
+            check_same_thread=False
+        )
         conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+        conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+
+        # Pages freed by log retention are handed back with PRAGMA incremental_vacuum.
+        # An existing file only switches mode after a one-time VACUUM.
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != AUTO_VACUUM_INCREMENTAL:
+            has_data = conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()[0] > 0
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            if has_data:
+                print("Veritabanı artımlı vakum moduna geçiriliyor (tek seferlik VACUUM)...")
+            # Needed even for a new file: journal_mode=WAL has already written its header
+            conn.execute("VACUUM")
         return conn
+
+    def close(self):
+        """Closes the connection for good. Only call it from the thread that runs the queries."""
+        with self._conn_lock:
+            self._closed = True
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    async def shutdown(self):
+        """
+        Closes the connection on the DB worker thread, after every query already queued,
+        then stops the worker. Queries issued afterwards fail instead of reopening the file.
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.executor, self.close)
+        self.executor.shutdown(wait=True)
+
+    async def run(self, func, *args, **kwargs):
+        """Run a blocking database call on the DB worker thread and await its result."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, _timed_call, func.__qualname__, functools.partial(func, *args, **kwargs))
+
+def _timed_call(name, call):
+    """Runs on the DB worker thread; records the time spent executing, not waiting in the queue."""
+    start = time.perf_counter()
+    try:
+        return call()
+    finally:
+        metrics.observe_db(name, (time.perf_counter() - start) * 1000)
+
+def threaded(func):
+    """
+    Decorator for repository methods.
+    Turns a blocking method into a coroutine executed on the DB worker thread.
+    """
+    @functools.wraps(func)
+    async def wrapper(self, *args, **kwargs):
+        return await self.db_connection.run(func, self, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,83 @@
+import asyncio
+
+class LogWriter:
+    """
+    Buffers command logs in memory and writes them in batches.
+    A background task flushes the buffer `flush_interval` seconds after the first
+    queued row, or immediately once `batch_size` rows are waiting.
+    Rows leave the buffer only once they are written; a failed batch is retried with
+    the next one, and at most `max_buffer` rows are kept.
+    """
+
+    def __init__(self, repository, flush_interval=0.5, batch_size=100, max_buffer=10000):
+        self.repository = repository
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_buffer = max_buffer
+        self._buffer = []
+        self._task = None
+        self._stopping = False
+        # Events and the lock are created lazily so they bind to the running loop
+        self._has_rows = None
+        self._full = None
+        self._flush_lock = None
+
+    def enqueue(self, **entry):
+        """Queues a log entry (same arguments as LogRepository.log_command). Never blocks."""
+        self._buffer.append(self.repository.build_row(**entry))
+        self._ensure_task()
+        self._has_rows.set()
+        if len(self._buffer) >= self.batch_size:
+            self._full.set()
+
+    def _ensure_task(self):
+        if self._task is None or self._task.done():
+            self._has_rows = asyncio.Event()
+            self._full = asyncio.Event()
+            self._stopping = False
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self):
+        while not self._stopping:
+            await self._has_rows.wait()
+            if len(self._buffer) < self.batch_size and not self._stopping:
+                try:
+                    await asyncio.wait_for(self._full.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            self._has_rows.clear()
+            self._full.clear()
+            await self.flush()
+
+    async def flush(self):
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            if not self._buffer:
+                return
+            # Rows queued while the batch is being written stay behind it
+            rows = self._buffer[:]
+            try:
+                await self.repository.log_commands(rows)
+            except Exception as e:
+                print(f"Logging failed, {len(rows)} rows kept for retry: {e}")
+                overflow = len(self._buffer) - self.max_buffer
+                if overflow > 0:
+                    del self._buffer[:overflow]
+                    print(f"Log buffer full, {overflow} oldest rows dropped")
+                return
+            del self._buffer[:len(rows)]
+
+    async def stop(self):
+        """Lets the background task finish its current batch, then writes whatever is still buffered."""
+        if self._task is not None:
+            # Not cancelled: a cancelled write could be dropped from the DB queue
+            self._stopping = True
+            self._has_rows.set()
+            self._full.set()
+            await self._task
+            self._task = None
+        await self.flush()
+        if self._buffer:
+            print(f"Logging failed, {len(self._buffer)} rows lost on shutdown")
+            self._buffer.clear()
@@ -0,0 +1,236 @@
+import json
+import sqlite3
+from utils.db.repositories.logs import HOUR_FORMAT
+from utils.metrics import LATENCY_BUCKETS_MS
+
+# SQL twin of utils.metrics.bucket_index, used by the rollup backfill
+BUCKET_CASE = "CASE " + " ".join(f"WHEN execution_time <= {bound} THEN {i}" for i, bound in enumerate(LATENCY_BUCKETS_MS)) + f" ELSE {len(LATENCY_BUCKETS_MS)} END"
+
+# --- Steps ---
+# Each step runs once, inside the transaction that records its version, and must not commit.
+# Databases created before schema_version existed replay every step, so the steps that
+# describe the old schema are idempotent (IF NOT EXISTS, column checks).
+
+def _command_logs(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS command_logs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            username TEXT,
+            command_name TEXT,
+            channel_id INTEGER,
+            timestamp TIMESTAMP,
+            args TEXT,
+            status TEXT,
+            execution_time REAL,
+            error_message TEXT
+        )
+    ''')
+    # Newest-first listing and retention walk this index instead of sorting the whole table
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_command_logs_timestamp_id ON command_logs (timestamp, id)')
+
+def _templates(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS templates (
+            name TEXT PRIMARY KEY,
+            roles TEXT
+        )
+    ''')
+
+def _active_contents(conn):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS active_contents_v2 (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            message_id INTEGER,
+            channel_id INTEGER,
+            name TEXT,
+            template_name TEXT,
+            description TEXT,
+            data TEXT,
+            signups TEXT
+        )
+    ''')
+    # Tables from before the description field
+    if 'description' not in _columns(conn, 'active_contents_v2'):
+        conn.execute('ALTER TABLE active_contents_v2 ADD COLUMN description TEXT')
+
+def _command_log_counter(conn):
+    # Row counter maintained by triggers, so the total never needs a COUNT(*) scan
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS command_log_stats (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            total INTEGER NOT NULL
+        )
+    ''')
+    conn.execute('INSERT OR IGNORE INTO command_log_stats (id, total) SELECT 1, COUNT(*) FROM command_logs')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_command_logs_insert AFTER INSERT ON command_logs
+        BEGIN
+            UPDATE command_log_stats SET total = total + 1 WHERE id = 1;
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_command_logs_delete AFTER DELETE ON command_logs
+        BEGIN
+            UPDATE command_log_stats SET total = total - 1 WHERE id = 1;
+        END
+    ''')
+
+def _content_rosters(conn):
+    # Roster and waiting list live in their own tables, one row per player,
+    # so a sign-up or assignment is a single small statement.
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS content_slots (
+            content_id INTEGER NOT NULL,
+            slot_index INTEGER NOT NULL,
+            player TEXT NOT NULL,
+            PRIMARY KEY (content_id, slot_index, player)
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS content_signups (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            content_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            name TEXT,
+            role TEXT
+        )
+    ''')
+    conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_content_signups_user ON content_signups (content_id, user_id)')
+    # get_latest_content_by_channel / the autocomplete index, and lookups by Discord message
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_active_contents_channel ON active_contents_v2 (channel_id, id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_active_contents_message ON active_contents_v2 (message_id)')
+
+    # slot_count replaces the JSON roster length
+    if 'slot_count' not in _columns(conn, 'active_contents_v2'):
+        conn.execute('ALTER TABLE active_contents_v2 ADD COLUMN slot_count INTEGER')
+    _migrate_json_rows(conn)
+
+def _command_log_rollups(conn):
+    # Hourly rollups per command, maintained by LogRepository._insert_rows (/logstats reads only these).
+    # Latency is kept as counts per utils.metrics bucket, so percentiles can be estimated.
+    backfill = not _table_exists(conn, 'command_log_hourly')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS command_log_hourly (
+            command_name TEXT NOT NULL,
+            hour TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            failures INTEGER NOT NULL,
+            total_ms REAL NOT NULL,
+            PRIMARY KEY (command_name, hour)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS command_log_buckets (
+            command_name TEXT NOT NULL,
+            hour TEXT NOT NULL,
+            bucket INTEGER NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (command_name, hour, bucket)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_command_log_hourly_hour ON command_log_hourly (hour)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_command_log_buckets_hour ON command_log_buckets (hour)')
+    if backfill:
+        backfill_log_rollups(conn)
+
+# (version, description, step), applied in order. Append only: never edit or renumber
+# a step that has shipped, add a new one instead.
+MIGRATIONS = (
+    (1, "command_logs table", _command_logs),
+    (2, "templates table", _templates),
+    (3, "active_contents_v2 table", _active_contents),
+    (4, "command log row counter", _command_log_counter),
+    (5, "normalized content rosters", _content_rosters),
+    (6, "hourly command log rollups", _command_log_rollups),
+)
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+def current_version(conn) -> int:
+    try:
+        return conn.execute('SELECT MAX(version) FROM schema_version').fetchone()[0] or 0
+    except sqlite3.OperationalError:
+        # No schema_version table: a new database, or one from before migrations
+        return 0
+
+def migrate(conn) -> int:
+    """
+    Brings the schema up to LATEST_VERSION and returns the number of steps applied.
+    Already current costs a single query. Every step commits together with its
+    version row, so a failing step leaves the database at the previous version and
+    the error propagates instead of starting with a half-upgraded schema.
+    """
+    version = current_version(conn)
+    if version >= LATEST_VERSION:
+        return 0
+
+    applied = 0
+    for step_version, description, step in MIGRATIONS:
+        if step_version <= version:
+            continue
+        # IMMEDIATE takes the write lock up front, so the step cannot fail halfway on a busy database
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    version INTEGER PRIMARY KEY,
+                    description TEXT NOT NULL,
+                    applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            step(conn)
+            conn.execute('INSERT INTO schema_version (version, description) VALUES (?, ?)', (step_version, description))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            print(f"Veritabanı geçişi başarısız: v{step_version} ({description})")
+            raise
+        applied += 1
+        if version:
+            print(f"Veritabanı şeması güncellendi: v{step_version} ({description})")
+    return applied
+
+# --- Helpers ---
+
+def _columns(conn, table):
+    return {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+
+def _table_exists(conn, name):
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)).fetchone() is not None
+
+def backfill_log_rollups(conn):
+    """
+    Builds the rollups of every row in command_logs. The rollup tables must be empty.
+    Like LogRepository._update_rollups, rows without an execution_time stay out of the buckets.
+    """
+    conn.execute(f'''
+        INSERT INTO command_log_hourly (command_name, hour, count, failures, total_ms)
+        SELECT command_name, strftime('{HOUR_FORMAT}', timestamp), COUNT(*), SUM(status = 'FAILED'), TOTAL(execution_time)
+        FROM command_logs GROUP BY 1, 2
+    ''')
+    conn.execute(f'''
+        INSERT INTO command_log_buckets (command_name, hour, bucket, count)
+        SELECT command_name, strftime('{HOUR_FORMAT}', timestamp), {BUCKET_CASE}, COUNT(*)
+        FROM command_logs WHERE execution_time IS NOT NULL GROUP BY 1, 2, 3
+    ''')
+
+def _migrate_json_rows(conn):
+    """Moves the legacy JSON `data`/`signups` columns into the normalized tables."""
+    rows = conn.execute('SELECT id, data, signups FROM active_contents_v2 WHERE slot_count IS NULL').fetchall()
+    for row in rows:
+        data = json.loads(row[1]) if row[1] else []
+        signups = json.loads(row[2]) if row[2] else []
+        conn.executemany(
+            'INSERT OR IGNORE INTO content_slots (content_id, slot_index, player) VALUES (?, ?, ?)',
+            [(row[0], idx, player) for idx, players in enumerate(data) for player in players]
+        )
+        conn.executemany(
+            'INSERT OR IGNORE INTO content_signups (content_id, user_id, name, role) VALUES (?, ?, ?, ?)',
+            [(row[0], s['user_id'], s['name'], s['role']) for s in signups]
+        )
+        conn.execute(
+            'UPDATE active_contents_v2 SET slot_count = ?, data = NULL, signups = NULL WHERE id = ?',
+            (len(data), row[0])
+        )
+    if rows:
+        print(f"{len(rows)} içerik yeni tablo yapısına taşındı.")
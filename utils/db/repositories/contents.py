@@ -1,91 +1,198 @@
 import sqlite3
-import json
+import threading
+from collections import OrderedDict
+from utils.db.connection import threaded
+
+class ContentCache:
+    """
+    Bounded LRU of parsed contents, addressable by id and by message_id.
+    Read from the event loop and written from the DB worker thread, hence the lock.
+    Callers always receive copies, so mutating a returned content never corrupts the cache.
+    """
+
+    def __init__(self, max_size=256):
+        self.max_size = max_size
+        self._by_id = OrderedDict()
+        self._id_by_message = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _copy(content):
+        return {
+            **content,
+            'data': [list(slot) for slot in content['data']],
+            'signups': [dict(s) for s in content['signups']]
+        }
+
+    def get(self, content_id):
+        with self._lock:
+            content = self._by_id.get(content_id)
+            if content is None:
+                return None
+            self._by_id.move_to_end(content_id)
+            return self._copy(content)
+
+    def get_by_message_id(self, message_id):
+        with self._lock:
+            content_id = self._id_by_message.get(message_id)
+        return self.get(content_id) if content_id is not None else None
+
+    def put(self, content):
+        with self._lock:
+            self._by_id[content['id']] = self._copy(content)
+            self._by_id.move_to_end(content['id'])
+            self._id_by_message[content['message_id']] = content['id']
+            while len(self._by_id) > self.max_size:
+                _, old = self._by_id.popitem(last=False)
+                self._id_by_message.pop(old['message_id'], None)
+
+    def update(self, content_id, mutate):
+        """Applies mutate(content) in place if the content is cached."""
+        with self._lock:
+            content = self._by_id.get(content_id)
+            if content is not None:
+                mutate(content)
+
+    def evict(self, content_id):
+        with self._lock:
+            content = self._by_id.pop(content_id, None)
+            if content is not None:
+                self._id_by_message.pop(content['message_id'], None)
 
 class ContentRepository:
     def __init__(self, db_connection):
         self.db_connection = db_connection
+        # Write-through: every mutation below updates the cache after its statement succeeds
+        self.cache = ContentCache()
+        # channel_id -> [(id, name, lowercase "name - id")], newest first; loaded lazily per channel.
+        # Lists are replaced, never mutated, so the event loop can read them while the DB thread writes.
+        self._channel_index = {}
 
-    def init_table(self):
+    @threaded
+    def create_content(self, message_id: int, channel_id: int, name: str, template_name: str, data: list, description: str = ""):
         conn = self.db_connection.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS active_contents_v2 (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                message_id INTEGER,
-                channel_id INTEGER,
-                name TEXT,
-                template_name TEXT,
-                description TEXT,
-                data TEXT,
-                signups TEXT
+        with conn:
+            cursor = conn.execute('''
+                INSERT INTO active_contents_v2 (message_id, channel_id, name, template_name, description, slot_count)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (message_id, channel_id, name, template_name, description, len(data)))
+            new_id = cursor.lastrowid
+            conn.executemany(
+                'INSERT OR IGNORE INTO content_slots (content_id, slot_index, player) VALUES (?, ?, ?)',
+                [(new_id, idx, player) for idx, players in enumerate(data) for player in players]
             )
-        ''')
-        
-        # Migration: Add description column if not exists
-        try:
-            cursor.execute("ALTER TABLE active_contents_v2 ADD COLUMN description TEXT")
-        except:
-            pass
-        
-        conn.commit()
-        conn.close()
-
-    def create_content(self, message_id: int, channel_id: int, name: str, template_name: str, data: dict, description: str = ""):
-        conn = self.db_connection.get_connection()
-        cursor = conn.cursor()
-        data_json = json.dumps(data, ensure_ascii=False)
-        signups_json = json.dumps([], ensure_ascii=False)
-        cursor.execute('''
-            INSERT INTO active_contents_v2 (message_id, channel_id, name, template_name, description, data, signups)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (message_id, channel_id, name, template_name, description, data_json, signups_json))
-        new_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+        self.cache.put({
+            'id': new_id,
+            'message_id': message_id,
+            'channel_id': channel_id,
+            'name': name,
+            'template_name': template_name,
+            'description': description or "",
+            'data': data,
+            'signups': []
+        })
+        entries = self._channel_index.get(channel_id)
+        if entries is not None:
+            self._channel_index[channel_id] = [self._index_entry(new_id, name)] + entries
         return new_id
 
-    def get_content(self, content_id: int):
+    # --- Per-channel name index (autocomplete / name resolution) ---
+
+    @staticmethod
+    def _index_entry(content_id, name):
+        return (content_id, name, f"{name} - {content_id}".lower())
+
+    @threaded
+    def _load_channel_index(self, channel_id: int):
         conn = self.db_connection.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM active_contents_v2 WHERE id = ?', (content_id,))
-        row = cursor.fetchone()
-        conn.close()
-        return self._parse_content_row(row)
+        rows = conn.execute('SELECT id, name FROM active_contents_v2 WHERE channel_id = ? ORDER BY id DESC', (channel_id,)).fetchall()
+        entries = [self._index_entry(row['id'], row['name']) for row in rows]
+        self._channel_index[channel_id] = entries
+        return entries
+
+    async def _channel_entries(self, channel_id: int):
+        entries = self._channel_index.get(channel_id)
+        if entries is None:
+            entries = await self._load_channel_index(channel_id)
+        return entries
+
+    async def search_contents(self, channel_id: int, query: str, limit: int = 25):
+        """
+        Returns [(id, name)] of the channel's contents whose "name - id" contains query,
+        prefix matches first, newest first within each group. Never loads rosters.
+        """
+        query = query.lower()
+        prefix, inner = [], []
+        for content_id, name, display in await self._channel_entries(channel_id):
+            if display.startswith(query):
+                prefix.append((content_id, name))
+                if len(prefix) >= limit:
+                    break
+            elif query in display and len(inner) < limit:
+                inner.append((content_id, name))
+        return (prefix + inner)[:limit]
+
+    async def find_content_id_by_name(self, channel_id: int, name: str):
+        """Id of the newest content in the channel with exactly this name, or None."""
+        for content_id, entry_name, _ in await self._channel_entries(channel_id):
+            if entry_name == name:
+                return content_id
+        return None
+
+    async def get_content(self, content_id: int):
+        cached = self.cache.get(content_id)
+        if cached is not None:
+            return cached
+        return await self._load_content('id', content_id)
 
-    def get_content_by_message_id(self, message_id: int):
+    async def get_content_by_message_id(self, message_id: int):
+        cached = self.cache.get_by_message_id(message_id)
+        if cached is not None:
+            return cached
+        return await self._load_content('message_id', message_id)
+
+    @threaded
+    def _load_content(self, column: str, value: int):
         conn = self.db_connection.get_connection()
         cursor = conn.cursor()
-        cursor.execute('SELECT * FROM active_contents_v2 WHERE message_id = ?', (message_id,))
+        cursor.execute(f'SELECT * FROM active_contents_v2 WHERE {column} = ?', (value,))
         row = cursor.fetchone()
-        conn.close()
-        return self._parse_content_row(row)
+        content = self._parse_content_row(conn, row)
+        if content:
+            self.cache.put(content)
+        return content
 
+    @threaded
     def get_latest_content_by_channel(self, channel_id: int):
         conn = self.db_connection.get_connection()
         cursor = conn.cursor()
         cursor.execute('SELECT * FROM active_contents_v2 WHERE channel_id = ? ORDER BY id DESC LIMIT 1', (channel_id,))
         row = cursor.fetchone()
-        conn.close()
-        return self._parse_content_row(row)
+        return self._parse_content_row(conn, row)
 
+    @threaded
     def get_active_contents_by_channel(self, channel_id: int):
         conn = self.db_connection.get_connection()
         cursor = conn.cursor()
         cursor.execute('SELECT * FROM active_contents_v2 WHERE channel_id = ? ORDER BY id DESC', (channel_id,))
         rows = cursor.fetchall()
-        conn.close()
         results = []
         for row in rows:
-            res = self._parse_content_row(row)
+            res = self._parse_content_row(conn, row)
             if res: results.append(res)
         return results
 
-    def _parse_content_row(self, row):
+    def _parse_content_row(self, conn, row):
         if row:
-            # Check for description column existence safely
-            desc = ""
-            if 'description' in row.keys():
-                desc = row['description'] or ""
+            data = [[] for _ in range(row['slot_count'] or 0)]
+            for slot in conn.execute('SELECT slot_index, player FROM content_slots WHERE content_id = ? ORDER BY slot_index, rowid', (row['id'],)):
+                if slot['slot_index'] < len(data):
+                    data[slot['slot_index']].append(slot['player'])
+
+            signups = [
+                {'user_id': s['user_id'], 'name': s['name'], 'role': s['role']}
+                for s in conn.execute('SELECT user_id, name, role FROM content_signups WHERE content_id = ? ORDER BY id', (row['id'],))
+            ]
 
             return {
                 'id': row['id'],
@@ -93,32 +200,97 @@ class ContentRepository:
                 'channel_id': row['channel_id'],
                 'name': row['name'],
                 'template_name': row['template_name'],
-                'description': desc,
-                'data': json.loads(row['data']),
-                'signups': json.loads(row['signups']) if row['signups'] else []
+                'description': row['description'] or "",
+                'data': data,
+                'signups': signups
             }
         return None
 
-    def update_content_data(self, message_id: int, data: dict):
-        # Keeps using message_id for easier lookups from Discord messages
+    # --- Row-level roster updates ---
+
+    @threaded
+    def add_signup(self, content_id: int, user_id: int, name: str, role: str) -> bool:
+        """Returns False if the user is already on the waiting list."""
         conn = self.db_connection.get_connection()
-        cursor = conn.cursor()
-        data_json = json.dumps(data, ensure_ascii=False)
-        cursor.execute('UPDATE active_contents_v2 SET data = ? WHERE message_id = ?', (data_json, message_id))
-        conn.commit()
-        conn.close()
+        with conn:
+            cursor = conn.execute(
+                'INSERT OR IGNORE INTO content_signups (content_id, user_id, name, role) VALUES (?, ?, ?, ?)',
+                (content_id, user_id, name, role)
+            )
+        if cursor.rowcount == 0:
+            return False
+        self.cache.update(content_id, lambda c: c['signups'].append({'user_id': user_id, 'name': name, 'role': role}))
+        return True
 
-    def update_content_signups(self, message_id: int, signups: list):
+    @threaded
+    def remove_signup(self, content_id: int, user_id: int) -> bool:
         conn = self.db_connection.get_connection()
-        cursor = conn.cursor()
-        signups_json = json.dumps(signups, ensure_ascii=False)
-        cursor.execute('UPDATE active_contents_v2 SET signups = ? WHERE message_id = ?', (signups_json, message_id))
-        conn.commit()
-        conn.close()
+        with conn:
+            cursor = conn.execute('DELETE FROM content_signups WHERE content_id = ? AND user_id = ?', (content_id, user_id))
+        if cursor.rowcount == 0:
+            return False
+
+        def mutate(c):
+            c['signups'] = [s for s in c['signups'] if s['user_id'] != user_id]
+        self.cache.update(content_id, mutate)
+        return True
+
+    @threaded
+    def assign_slot(self, content_id: int, slot_index: int, player: str) -> bool:
+        conn = self.db_connection.get_connection()
+        with conn:
+            cursor = conn.execute(
+                'INSERT OR IGNORE INTO content_slots (content_id, slot_index, player) VALUES (?, ?, ?)',
+                (content_id, slot_index, player)
+            )
+        if cursor.rowcount == 0:
+            return False
 
+        def mutate(c):
+            if slot_index < len(c['data']):
+                c['data'][slot_index].append(player)
+        self.cache.update(content_id, mutate)
+        return True
+
+    @threaded
+    def clear_slot(self, content_id: int, slot_index: int) -> int:
+        conn = self.db_connection.get_connection()
+        with conn:
+            cursor = conn.execute('DELETE FROM content_slots WHERE content_id = ? AND slot_index = ?', (content_id, slot_index))
+
+        def mutate(c):
+            if slot_index < len(c['data']):
+                c['data'][slot_index] = []
+        self.cache.update(content_id, mutate)
+        return cursor.rowcount
+
+    @threaded
+    def remove_slot_player(self, content_id: int, slot_index: int, player: str) -> bool:
+        conn = self.db_connection.get_connection()
+        with conn:
+            cursor = conn.execute(
+                'DELETE FROM content_slots WHERE content_id = ? AND slot_index = ? AND player = ?',
+                (content_id, slot_index, player)
+            )
+        if cursor.rowcount == 0:
+            return False
+
+        def mutate(c):
+            if slot_index < len(c['data']) and player in c['data'][slot_index]:
+                c['data'][slot_index].remove(player)
+        self.cache.update(content_id, mutate)
+        return True
+
+    @threaded
     def delete_content(self, content_id: int):
         conn = self.db_connection.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('DELETE FROM active_contents_v2 WHERE id = ?', (content_id,))
-        conn.commit()
-        conn.close()
+        row = conn.execute('SELECT channel_id FROM active_contents_v2 WHERE id = ?', (content_id,)).fetchone()
+        with conn:
+            conn.execute('DELETE FROM content_slots WHERE content_id = ?', (content_id,))
+            conn.execute('DELETE FROM content_signups WHERE content_id = ?', (content_id,))
+            conn.execute('DELETE FROM active_contents_v2 WHERE id = ?', (content_id,))
+        # Only after the commit: a failed delete must leave the content listed
+        if row and row['channel_id'] in self._channel_index:
+            channel_id = row['channel_id']
+            self._channel_index[channel_id] = [e for e in self._channel_index[channel_id] if e[0] != content_id]
+        self.cache.evict(content_id)
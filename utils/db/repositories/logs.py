@@ -1,57 +1,206 @@
 import sqlite3
 import json
+import os
 from datetime import datetime
+from utils.db.connection import threaded
+from utils.metrics import LATENCY_BUCKETS_MS, bucket_index, bucket_percentile
+
+HOUR_FORMAT = '%Y-%m-%d %H:00:00'
+
+# Column names as consumed by the Logger cog
+LOG_COLUMNS = '''
+    id, timestamp, user_id AS executor_id, username AS executor_name, command_name AS command_type,
+    channel_id, args AS details, status, execution_time AS execution_time_ms, error_message
+'''
 
 class LogRepository:
     def __init__(self, db_connection):
         self.db_connection = db_connection
 
-    def init_table(self):
-        conn = self.db_connection.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS command_logs (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER,
-                username TEXT,
-                command_name TEXT,
-                channel_id INTEGER,
-                timestamp TIMESTAMP,
-                args TEXT,
-                status TEXT,
-                execution_time REAL,
-                error_message TEXT
-            )
-        ''')
-        conn.commit()
-        conn.close()
+    @staticmethod
+    def build_row(user_id, username, command_name, channel_id, args, status, execution_time, error_message=None):
+        """Serializes one log entry. The timestamp is taken here, not when the row is written."""
+        return (user_id, username, command_name, channel_id, datetime.now(), json.dumps(args, ensure_ascii=False), status, execution_time, error_message)
 
+    @threaded
     def log_command(self, user_id, username, command_name, channel_id, args, status, execution_time, error_message=None):
+        self._insert_rows([self.build_row(user_id, username, command_name, channel_id, args, status, execution_time, error_message)])
+
+    @threaded
+    def log_commands(self, rows):
+        """Writes rows produced by build_row in a single transaction."""
+        self._insert_rows(rows)
+
+    def _insert_rows(self, rows):
         conn = self.db_connection.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO command_logs (user_id, username, command_name, channel_id, timestamp, args, status, execution_time, error_message)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (user_id, username, command_name, channel_id, datetime.now(), json.dumps(args, ensure_ascii=False), status, execution_time, error_message))
-        conn.commit()
-        conn.close()
+        with conn:
+            conn.executemany('''
+                INSERT INTO command_logs (user_id, username, command_name, channel_id, timestamp, args, status, execution_time, error_message)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
+            self._update_rollups(conn, rows)
+
+    @staticmethod
+    def _update_rollups(conn, rows):
+        hourly, buckets = {}, {}
+        for row in rows:
+            command_name, timestamp, status, execution_time = row[2], row[4], row[6], row[7]
+            hour = timestamp.strftime(HOUR_FORMAT)
+            count, failures, total_ms = hourly.get((command_name, hour), (0, 0, 0.0))
+            hourly[(command_name, hour)] = (count + 1, failures + (status == 'FAILED'), total_ms + (execution_time or 0.0))
+            # Rows without a duration count towards totals but not the latency histogram
+            if execution_time is not None:
+                key = (command_name, hour, bucket_index(execution_time))
+                buckets[key] = buckets.get(key, 0) + 1
+
+        conn.executemany('''
+            INSERT INTO command_log_hourly (command_name, hour, count, failures, total_ms) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (command_name, hour) DO UPDATE SET
+                count = count + excluded.count,
+                failures = failures + excluded.failures,
+                total_ms = total_ms + excluded.total_ms
+        ''', [(*key, *values) for key, values in hourly.items()])
+        conn.executemany('''
+            INSERT INTO command_log_buckets (command_name, hour, bucket, count) VALUES (?, ?, ?, ?)
+            ON CONFLICT (command_name, hour, bucket) DO UPDATE SET count = count + excluded.count
+        ''', [(*key, count) for key, count in buckets.items()])
+
+    @threaded
+    def get_command_stats(self, since: datetime):
+        """
+        Per-command totals since `since` (rounded down to the hour), from the rollup tables:
+        [{'command', 'count', 'failures', 'avg_ms', 'p50_ms', 'p95_ms', 'p99_ms'}], busiest first.
+        """
+        conn = self.db_connection.get_connection()
+        hour = since.strftime(HOUR_FORMAT)
+        histograms = {}
+        for row in conn.execute('SELECT command_name, bucket, SUM(count) FROM command_log_buckets WHERE hour >= ? GROUP BY 1, 2', (hour,)):
+            counts = histograms.setdefault(row[0], [0] * (len(LATENCY_BUCKETS_MS) + 1))
+            counts[row[1]] = row[2]
+
+        stats = []
+        for row in conn.execute('''
+            SELECT command_name, SUM(count), SUM(failures), SUM(total_ms) FROM command_log_hourly
+            WHERE hour >= ? GROUP BY 1 ORDER BY 2 DESC
+        ''', (hour,)):
+            counts = histograms.get(row[0], [])
+            timed = sum(counts) # Rows with an execution_time
+            stats.append({
+                'command': row[0],
+                'count': row[1],
+                'failures': row[2],
+                'avg_ms': row[3] / timed if timed else 0.0,
+                'p50_ms': bucket_percentile(counts, 0.50),
+                'p95_ms': bucket_percentile(counts, 0.95),
+                'p99_ms': bucket_percentile(counts, 0.99),
+            })
+        return stats
 
-    def get_logs(self, limit=10, offset=0):
+    @threaded
+    def get_logs(self, limit=10, before=None):
+        """
+        Newest-first page of logs (keyset pagination).
+        Pass (timestamp, id) of the last row of the previous page as before to get the next page.
+        The cursor carries its own position, so it stays valid after that row is archived.
+        """
         conn = self.db_connection.get_connection()
         cursor = conn.cursor()
-        cursor.execute('SELECT * FROM command_logs ORDER BY timestamp DESC LIMIT ? OFFSET ?', (limit, offset))
-        rows = cursor.fetchall()
-        
-        cursor.execute('SELECT COUNT(*) FROM command_logs')
-        total = cursor.fetchone()[0]
-        
-        conn.close()
-        return rows, total
+        if before is None:
+            cursor.execute(f'SELECT {LOG_COLUMNS} FROM command_logs ORDER BY timestamp DESC, id DESC LIMIT ?', (limit,))
+        else:
+            cursor.execute(f'''
+                SELECT {LOG_COLUMNS} FROM command_logs
+                WHERE (timestamp, id) < (?, ?)
+                ORDER BY timestamp DESC, id DESC LIMIT ?
+            ''', (*before, limit))
+        return cursor.fetchall()
 
+    @threaded
+    def get_total_log_count(self):
+        conn = self.db_connection.get_connection()
+        row = conn.execute('SELECT total FROM command_log_stats WHERE id = 1').fetchone()
+        return row[0] if row else 0
+
+    @threaded
+    def get_log_by_id(self, log_id):
+        conn = self.db_connection.get_connection()
+        return conn.execute(f'SELECT {LOG_COLUMNS} FROM command_logs WHERE id = ?', (log_id,)).fetchone()
+
+    @threaded
     def get_log_details(self, log_id):
         conn = self.db_connection.get_connection()
         cursor = conn.cursor()
         cursor.execute('SELECT * FROM command_logs WHERE id = ?', (log_id,))
         row = cursor.fetchone()
-        conn.close()
         return row
+
+    # --- Retention ---
+
+    async def archive_older_than(self, cutoff: datetime, archive_path: str, batch_size: int = 1000) -> int:
+        """
+        Moves logs with timestamp < cutoff into command_logs of the archive database, one
+        batch per DB call so other queries interleave, then returns the freed pages to the
+        filesystem. Returns the number of rows moved.
+        """
+        if not os.path.isabs(archive_path):
+            archive_path = os.path.join(os.path.dirname(self.db_connection.db_path), archive_path)
+
+        moved = 0
+        while True:
+            count = await self._archive_batch(cutoff, archive_path, batch_size)
+            moved += count
+            if count < batch_size:
+                break
+        if moved:
+            # Stop once nothing more is released: without auto_vacuum=INCREMENTAL the
+            # pragma is a no-op and the free page count never reaches zero
+            free = None
+            while True:
+                remaining = await self._incremental_vacuum()
+                if not remaining or (free is not None and remaining >= free):
+                    break
+                free = remaining
+        return moved
+
+    def _attach_archive(self, conn, archive_path):
+        attached = {row['name']: row['file'] for row in conn.execute('PRAGMA database_list')}
+        if 'archive' in attached and os.path.realpath(attached['archive']) != os.path.realpath(archive_path):
+            # log_retention.archive changed since the last run
+            conn.execute('DETACH DATABASE archive')
+            del attached['archive']
+        if 'archive' not in attached:
+            conn.execute('ATTACH DATABASE ? AS archive', (archive_path,))
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS archive.command_logs (
+                    id INTEGER PRIMARY KEY,
+                    user_id INTEGER,
+                    username TEXT,
+                    command_name TEXT,
+                    channel_id INTEGER,
+                    timestamp TIMESTAMP,
+                    args TEXT,
+                    status TEXT,
+                    execution_time REAL,
+                    error_message TEXT
+                )
+            ''')
+            conn.commit()
+
+    @threaded
+    def _archive_batch(self, cutoff: datetime, archive_path: str, batch_size: int) -> int:
+        conn = self.db_connection.get_connection()
+        self._attach_archive(conn, archive_path)
+        # Oldest rows first, through the timestamp index. A crash between the two files'
+        # commits can leave a row in both; INSERT OR IGNORE makes the retry harmless.
+        batch = 'SELECT id FROM main.command_logs WHERE timestamp < ? ORDER BY timestamp, id LIMIT ?'
+        with conn:
+            conn.execute(f'INSERT OR IGNORE INTO archive.command_logs SELECT * FROM main.command_logs WHERE id IN ({batch})', (cutoff, batch_size))
+            cursor = conn.execute(f'DELETE FROM main.command_logs WHERE id IN ({batch})', (cutoff, batch_size))
+        return cursor.rowcount
+
+    @threaded
+    def _incremental_vacuum(self, pages: int = 2000) -> int:
+        """Releases up to `pages` free pages; returns how many are still free."""
+        conn = self.db_connection.get_connection()
+        conn.execute(f'PRAGMA main.incremental_vacuum({int(pages)})').fetchall()
+        return conn.execute('PRAGMA main.freelist_count').fetchone()[0]
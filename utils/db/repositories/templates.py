@@ -1,51 +1,107 @@
 import json
 import sqlite3
+from utils.db.connection import threaded
+
+def normalize_template(template_roles):
+    """Returns (parties_list_of_lists, flat_roles_list)"""
+    if not template_roles:
+        return [], []
+        
+    # Check if legacy (list of strings/dicts) or new (list of lists)
+    first = template_roles[0]
+    parties = []
+    if isinstance(first, list):
+        parties = template_roles
+    else:
+        parties = [template_roles]
+        
+    # Flatten
+    flat = []
+    final_parties = []
+    for p in parties:
+        p_clean = []
+        for r in p:
+            name = r['name'] if isinstance(r, dict) else str(r)
+            p_clean.append(name)
+            flat.append(name)
+        final_parties.append(p_clean)
+        
+    return final_parties, flat
 
 class TemplateRepository:
     def __init__(self, db_connection):
         self.db_connection = db_connection
+        # Parsed templates by name, filled lazily and refreshed by save/delete.
+        # Cached values are shared: callers must treat them as read-only.
+        # Only existing templates are cached: names are free text, so misses would pile up.
+        self._cache = {}
+        self._names = None
 
-    def init_table(self):
-        conn = self.db_connection.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS templates (
-                name TEXT PRIMARY KEY,
-                roles TEXT
-            )
-        ''')
-        conn.commit()
-        conn.close()
+    @staticmethod
+    def _build_template(name, roles):
+        parties, flat_roles = normalize_template(roles)
+        return {
+            'name': name,
+            'roles': roles,
+            'parties': tuple(tuple(p) for p in parties),
+            'flat_roles': tuple(flat_roles)
+        }
 
+    @threaded
     def save_template(self, name: str, roles: list):
         conn = self.db_connection.get_connection()
         cursor = conn.cursor()
         roles_json = json.dumps(roles, ensure_ascii=False)
         cursor.execute('INSERT OR REPLACE INTO templates (name, roles) VALUES (?, ?)', (name, roles_json))
         conn.commit()
-        conn.close()
+        # Store a decoded copy so later edits to `roles` by the caller don't leak into the cache
+        self._cache[name] = self._build_template(name, json.loads(roles_json))
+        self._names = None
+
+    async def get_template(self, name: str):
+        """
+        Returns {'name', 'roles', 'parties', 'flat_roles'} or None.
+        'parties' and 'flat_roles' are the normalized form of 'roles'.
+        """
+        cached = self._cache.get(name)
+        if cached is None:
+            names = self._names
+            if names is not None and name not in names:
+                return None # Known not to exist, no query needed
+            cached = await self._load_template(name)
+        return cached
 
-    def get_template(self, name: str):
+    @threaded
+    def _load_template(self, name: str):
         conn = self.db_connection.get_connection()
         cursor = conn.cursor()
         cursor.execute('SELECT roles FROM templates WHERE name = ?', (name,))
         row = cursor.fetchone()
-        conn.close()
-        if row:
-            return {'name': name, 'roles': json.loads(row[0])}
-        return None
+        if not row:
+            return None
+        template = self._cache[name] = self._build_template(name, json.loads(row[0]))
+        return template
+
+    async def get_all_templates(self):
+        names = self._names
+        if names is None:
+            names = await self._load_template_names()
+        return list(names)
 
-    def get_all_templates(self):
+    @threaded
+    def _load_template_names(self):
         conn = self.db_connection.get_connection()
         cursor = conn.cursor()
         cursor.execute('SELECT name FROM templates')
         rows = cursor.fetchall()
-        conn.close()
-        return [row[0] for row in rows]
+        self._names = tuple(row[0] for row in rows)
+        return self._names
 
+    @threaded
     def delete_template(self, name: str):
         conn = self.db_connection.get_connection()
         cursor = conn.cursor()
         cursor.execute('DELETE FROM templates WHERE name = ?', (name,))
         conn.commit()
-        conn.close()
+        self._cache.pop(name, None)
+        self._names = None
@@ -0,0 +1,27 @@
+import asyncio
+import contextlib
+
+class KeyedLock:
+    """
+    One asyncio.Lock per key, created on demand and dropped once nobody holds or waits on it.
+    Serializes work on the same key (e.g. one content post) while different keys run in parallel.
+    """
+
+    def __init__(self):
+        self._locks = {}
+        self._waiters = {}
+
+    @contextlib.asynccontextmanager
+    async def hold(self, key):
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        try:
+            async with lock:
+                yield
+        finally:
+            self._waiters[key] -= 1
+            if self._waiters[key] == 0:
+                del self._waiters[key]
+                del self._locks[key]
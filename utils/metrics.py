@@ -0,0 +1,263 @@
+import asyncio
+import bisect
+import re
+import threading
+import time
+import aiohttp
+from aiohttp import web
+
+# Upper bounds (ms) of the latency buckets; one more bucket catches everything above.
+# Shared by every histogram so results can be compared and merged.
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+PREFIX = "gaddar"
+
+# Snowflakes and other numeric path segments, so HTTP routes keep a small label set
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+# Interaction/webhook tokens: unique per interaction and secret, never a label
+_TOKEN_SEGMENT = re.compile(r"(/(?:interactions|webhooks)/\d+/)[^/]+")
+
+def bucket_index(ms: float) -> int:
+    """Index of the bucket a value falls in (values equal to a bound belong to that bound)."""
+    return bisect.bisect_left(LATENCY_BUCKETS_MS, ms)
+
+def bucket_percentile(counts, q: float, max_value: float = None):
+    """
+    Estimates the q-th quantile (0-1) from per-bucket counts, interpolating linearly
+    inside the bucket. The overflow bucket is capped at max_value when it is known.
+    """
+    total = sum(counts)
+    if not total:
+        return None
+    target = q * total
+    seen = 0
+    for i, count in enumerate(counts):
+        if not count:
+            continue
+        if seen + count >= target:
+            lower = LATENCY_BUCKETS_MS[i - 1] if i > 0 else 0
+            upper = LATENCY_BUCKETS_MS[i] if i < len(LATENCY_BUCKETS_MS) else (max_value or lower)
+            value = lower + (upper - lower) * (target - seen) / count
+            return min(value, max_value) if max_value is not None else value
+        seen += count
+    return max_value
+
+class Histogram:
+    """Latency histogram over LATENCY_BUCKETS_MS. Not locked: Metrics serializes access."""
+    __slots__ = ('counts', 'count', 'sum', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, ms: float):
+        self.counts[bucket_index(ms)] += 1
+        self.count += 1
+        self.sum += ms
+        if ms > self.max:
+            self.max = ms
+
+    def percentile(self, q: float):
+        return bucket_percentile(self.counts, q, self.max)
+
+    def copy(self):
+        h = Histogram()
+        h.counts, h.count, h.sum, h.max = list(self.counts), self.count, self.sum, self.max
+        return h
+
+class Metrics:
+    """
+    In-process counters and latency histograms.
+
+    Fed from the event loop (commands, Discord HTTP, loop lag) and from the DB worker thread
+    (query time), so every update takes the lock; it is held only for a few additions.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.commands = {}          # command -> Histogram
+        self.command_failures = {}  # command -> count
+        self.db = {}                # repository method -> Histogram
+        self.http = {}              # "METHOD /route" -> Histogram
+        self.http_statuses = {}     # status code -> count
+        self.http_exceptions = 0
+        self.errors = {}            # exception type -> count
+        self.loop_lag = Histogram()
+        self.loop_lag_last = 0.0
+        self.loop_blocks = {}       # code location -> count (LoopWatchdog)
+        self._loop_monitor = None
+        self._runner = None
+
+    @staticmethod
+    def _observe(table, key, ms):
+        hist = table.get(key)
+        if hist is None:
+            hist = table[key] = Histogram()
+        hist.observe(ms)
+
+    def observe_command(self, command: str, ms: float, failed: bool = False):
+        with self._lock:
+            self._observe(self.commands, command, ms)
+            if failed:
+                self.command_failures[command] = self.command_failures.get(command, 0) + 1
+
+    def observe_db(self, operation: str, ms: float):
+        with self._lock:
+            self._observe(self.db, operation, ms)
+
+    def observe_http(self, route: str, status: int, ms: float):
+        with self._lock:
+            self._observe(self.http, route, ms)
+            self.http_statuses[status] = self.http_statuses.get(status, 0) + 1
+
+    def count_http_exception(self):
+        with self._lock:
+            self.http_exceptions += 1
+
+    def count_error(self, error: BaseException):
+        name = type(error).__name__
+        with self._lock:
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+    def count_loop_block(self, location: str):
+        with self._lock:
+            self.loop_blocks[location] = self.loop_blocks.get(location, 0) + 1
+
+    def snapshot(self) -> dict:
+        """Consistent copy of every metric, safe to read without the lock."""
+        with self._lock:
+            return {
+                'uptime': time.time() - self.started,
+                'commands': {k: h.copy() for k, h in self.commands.items()},
+                'command_failures': dict(self.command_failures),
+                'db': {k: h.copy() for k, h in self.db.items()},
+                'http': {k: h.copy() for k, h in self.http.items()},
+                'http_statuses': dict(self.http_statuses),
+                'http_exceptions': self.http_exceptions,
+                'errors': dict(self.errors),
+                'loop_lag': self.loop_lag.copy(),
+                'loop_lag_last': self.loop_lag_last,
+                'loop_blocks': dict(self.loop_blocks),
+            }
+
+    @staticmethod
+    def merged(histograms) -> Histogram:
+        total = Histogram()
+        for h in histograms:
+            total.counts = [a + b for a, b in zip(total.counts, h.counts)]
+            total.count += h.count
+            total.sum += h.sum
+            total.max = max(total.max, h.max)
+        return total
+
+    # --- Event loop lag ---
+
+    def start_loop_monitor(self, interval: float = 0.5):
+        """Measures how late a sleep(interval) wakes up; a busy or blocked loop shows up as lag."""
+        if self._loop_monitor is not None:
+            return
+
+        async def monitor():
+            loop = asyncio.get_running_loop()
+            while True:
+                expected = loop.time() + interval
+                await asyncio.sleep(interval)
+                lag = max(0.0, loop.time() - expected) * 1000
+                with self._lock:
+                    self.loop_lag.observe(lag)
+                    self.loop_lag_last = lag
+
+        self._loop_monitor = asyncio.get_running_loop().create_task(monitor())
+
+    # --- Discord HTTP ---
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """aiohttp tracing for the bot's HTTP session (pass as http_trace= to the client)."""
+        config = aiohttp.TraceConfig()
+
+        async def on_request_start(session, ctx, params):
+            ctx.started = time.perf_counter()
+
+        async def on_request_end(session, ctx, params):
+            self.observe_http(http_route(params.method, params.url.path), params.response.status, (time.perf_counter() - ctx.started) * 1000)
+
+        async def on_request_exception(session, ctx, params):
+            self.count_http_exception()
+
+        config.on_request_start.append(on_request_start)
+        config.on_request_end.append(on_request_end)
+        config.on_request_exception.append(on_request_exception)
+        return config
+
+    # --- Prometheus text format ---
+
+    def render_prometheus(self) -> str:
+        snap = self.snapshot()
+        lines = []
+
+        def histogram(name, help_text, label, table):
+            lines.append(f"# HELP {PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {PREFIX}_{name} histogram")
+            for key, h in sorted(table.items()):
+                labels = f'{label}="{_escape(key)}",' if label else ""
+                cumulative = 0
+                for bound, count in zip((*LATENCY_BUCKETS_MS, "+Inf"), h.counts):
+                    cumulative += count
+                    lines.append(f'{PREFIX}_{name}_bucket{{{labels}le="{bound}"}} {cumulative}')
+                labels = f"{{{labels.rstrip(',')}}}" if labels else ""
+                lines.append(f"{PREFIX}_{name}_sum{labels} {h.sum:.3f}")
+                lines.append(f"{PREFIX}_{name}_count{labels} {h.count}")
+
+        def counter(name, help_text, label, table):
+            lines.append(f"# HELP {PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {PREFIX}_{name} counter")
+            for key, value in sorted(table.items()):
+                lines.append(f'{PREFIX}_{name}{{{label}="{_escape(key)}"}} {value}')
+
+        histogram("command_duration_milliseconds", "Slash command execution time.", "command", snap['commands'])
+        counter("command_failures_total", "Slash commands that raised.", "command", snap['command_failures'])
+        histogram("db_duration_milliseconds", "Time spent on the DB worker thread per repository call.", "operation", snap['db'])
+        histogram("http_duration_milliseconds", "Discord HTTP request time.", "route", snap['http'])
+        counter("http_responses_total", "Discord HTTP responses by status code.", "status", snap['http_statuses'])
+        lines.append(f"# TYPE {PREFIX}_http_exceptions_total counter")
+        lines.append(f"{PREFIX}_http_exceptions_total {snap['http_exceptions']}")
+        counter("errors_total", "Unhandled errors reported by the error handler.", "type", snap['errors'])
+        histogram("event_loop_lag_milliseconds", "Event loop scheduling delay.", None, {"": snap['loop_lag']})
+        lines.append(f"# TYPE {PREFIX}_event_loop_lag_last_milliseconds gauge")
+        lines.append(f"{PREFIX}_event_loop_lag_last_milliseconds {snap['loop_lag_last']:.3f}")
+        counter("event_loop_blocks_total", "Event loop blocks detected by the watchdog.", "location", snap['loop_blocks'])
+        lines.append(f"# TYPE {PREFIX}_uptime_seconds gauge")
+        lines.append(f"{PREFIX}_uptime_seconds {snap['uptime']:.0f}")
+        return "\n".join(lines) + "\n"
+
+    async def start_http_server(self, port: int, host: str = "127.0.0.1"):
+        """Serves GET /metrics in the Prometheus text format on the bot's event loop."""
+        async def handle(request):
+            return web.Response(text=self.render_prometheus(), content_type="text/plain", charset="utf-8")
+
+        app = web.Application()
+        app.router.add_get("/metrics", handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+
+    async def stop(self):
+        if self._loop_monitor is not None:
+            self._loop_monitor.cancel()
+            self._loop_monitor = None
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+def http_route(method: str, path: str) -> str:
+    """Metric label of a request: "POST /api/v10/interactions/{id}/{token}/callback"."""
+    path = _TOKEN_SEGMENT.sub(r"\1{token}", path)
+    return f"{method} {_ID_SEGMENT.sub('/{id}', path)}"
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+metrics = Metrics()
@@ -0,0 +1,45 @@
+import asyncio
+
+class RefreshScheduler:
+    """
+    Coalesces repeated refresh requests per key (e.g. one Discord message).
+
+    The first request runs immediately; requests arriving while a refresh is running or
+    within `interval` seconds after it are merged into a single trailing refresh. Only the
+    most recently scheduled callback runs, so it always renders the latest state.
+    """
+
+    def __init__(self, interval=1.0):
+        self.interval = interval
+        self._pending = {}
+        self._tasks = {}
+
+    def schedule(self, key, callback):
+        """callback: zero-argument coroutine function performing the refresh."""
+        self._pending[key] = callback
+        if key not in self._tasks:
+            self._tasks[key] = asyncio.get_running_loop().create_task(self._run(key))
+
+    async def _run(self, key):
+        loop = asyncio.get_running_loop()
+        try:
+            while key in self._pending:
+                callback = self._pending.pop(key)
+                started = loop.time()
+                try:
+                    await callback()
+                except Exception as e:
+                    print(f"Refresh error ({key}): {e}")
+                delay = self.interval - (loop.time() - started)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+        finally:
+            self._tasks.pop(key, None)
+
+    async def stop(self):
+        """Drops queued refreshes and cancels the running ones."""
+        self._pending.clear()
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,103 @@
+import asyncio
+import random
+import aiohttp
+import discord
+
+class RoleAssigner:
+    """
+    Adds one role to many members with bounded concurrency.
+
+    discord.py already queues requests on its per-route rate limit buckets. On top of that,
+    a 429 or a transient failure pauses every worker of the run (shared backoff) before the
+    request is retried, so a large channel never stampedes the route.
+    """
+
+    def __init__(self, role: discord.Role, reason: str = None, concurrency: int = 5, max_retries: int = 3, base_delay: float = 1.0):
+        self.role = role
+        self.reason = reason
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+
+        self.given = [] # Members that received the role
+        self.failed = 0
+        self.retries = 0
+        self.total = 0
+        self.cancelled = False
+        self._resume_at = 0.0
+
+    @property
+    def done(self) -> int:
+        return len(self.given) + self.failed
+
+    @property
+    def skipped(self) -> int:
+        """Members left untouched because the run was cancelled."""
+        return self.total - self.done
+
+    def cancel(self):
+        """Stops handing out new members; requests already in flight still complete."""
+        self.cancelled = True
+
+    async def run(self, members):
+        """Assigns the role to every member; results are collected in given/failed."""
+        queue = asyncio.Queue()
+        for member in members:
+            queue.put_nowait(member)
+        self.total = queue.qsize()
+
+        workers = [asyncio.create_task(self._worker(queue)) for _ in range(min(self.concurrency, queue.qsize()))]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for w in workers:
+                w.cancel()
+        return self
+
+    async def _worker(self, queue: asyncio.Queue):
+        while not queue.empty() and not self.cancelled:
+            member = queue.get_nowait()
+            if await self._assign(member):
+                self.given.append(member)
+            else:
+                self.failed += 1
+
+    async def _assign(self, member) -> bool:
+        loop = asyncio.get_running_loop()
+        for attempt in range(self.max_retries + 1):
+            # Honour a backoff requested by any worker
+            wait = self._resume_at - loop.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+            try:
+                await member.add_roles(self.role, reason=self.reason)
+                return True
+            except discord.Forbidden:
+                return False
+            except Exception as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None or attempt == self.max_retries:
+                    print(f"Hata ({member}): {e}")
+                    return False
+                self.retries += 1
+                self._resume_at = max(self._resume_at, loop.time() + delay)
+        return False
+
+    def _retry_delay(self, error: Exception, attempt: int):
+        """Seconds to back off before retrying, or None if the error is not transient."""
+        backoff = self.base_delay * (2 ** attempt) * random.uniform(1.0, 1.5)
+
+        if isinstance(error, discord.RateLimited):
+            return error.retry_after
+        if isinstance(error, discord.HTTPException):
+            if error.status == 429:
+                headers = getattr(error.response, 'headers', None) or {}
+                retry_after = headers.get('Retry-After')
+                return float(retry_after) if retry_after else backoff
+            if error.status >= 500:
+                return backoff
+            return None
+        if isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError, ConnectionError)):
+            return backoff
+        return None
@@ -0,0 +1,101 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from utils.metrics import metrics
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STACK_DEPTH = 12
+
+class LoopWatchdog:
+    """
+    Detects callbacks that block the event loop.
+
+    A task on the loop refreshes a heartbeat every `interval` seconds; a daemon thread checks it.
+    When the heartbeat is older than the threshold, the loop thread's current stack is captured
+    (it is still inside the blocking call) and printed with the command, cog and function involved.
+    """
+
+    def __init__(self, threshold_ms: float = 250):
+        self.threshold = threshold_ms / 1000
+        self.interval = min(0.1, self.threshold / 2)
+        self._last_beat = 0.0
+        self._loop_thread = None
+        self._heartbeat_task = None
+        self._thread = None
+        self._stopped = threading.Event()
+
+    def start(self):
+        """Must be called from the event loop to watch."""
+        if self._thread is not None:
+            return
+        self._loop_thread = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._heartbeat_task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            self._heartbeat_task = None
+
+    async def _heartbeat(self):
+        while True:
+            self._last_beat = time.monotonic()
+            await asyncio.sleep(self.interval)
+
+    def _watch(self):
+        blocked_beat = None # Heartbeat the current block started after
+        while not self._stopped.wait(self.interval):
+            beat = self._last_beat
+            stalled = time.monotonic() - beat
+            if stalled > self.threshold + self.interval:
+                if blocked_beat != beat:
+                    blocked_beat = beat
+                    self._report(stalled)
+            elif blocked_beat is not None:
+                print(f"Olay döngüsü serbest kaldı (~{(beat - blocked_beat - self.interval) * 1000:.0f} ms bloke).")
+                blocked_beat = None
+
+    def _report(self, stalled: float):
+        frame = sys._current_frames().get(self._loop_thread)
+        if frame is None:
+            return
+
+        location, command = self._describe(frame)
+        metrics.count_loop_block(location)
+
+        stack = "".join(traceback.format_list(traceback.extract_stack(frame)[-STACK_DEPTH:]))
+        print(
+            f"⚠️ Olay döngüsü {stalled * 1000:.0f} ms'dir bloke! "
+            f"Komut: {command or '-'} | Konum: {location}\n{stack}",
+            end=""
+        )
+
+    @staticmethod
+    def _describe(frame):
+        """
+        Returns ("cogs/x.py:line Class.func", command name) for the innermost frame in the
+        project's own code; library frames (sqlite3, yaml, discord...) are skipped.
+        """
+        location, command = None, None
+        while frame is not None:
+            filename = os.path.abspath(frame.f_code.co_filename)
+            if location is None and filename.startswith(BASE_DIR) and 'site-packages' not in filename and filename != os.path.abspath(__file__):
+                rel = os.path.relpath(filename, BASE_DIR).replace(os.sep, "/")
+                # co_qualname is Python 3.11+
+                location = f"{rel}:{frame.f_lineno} {getattr(frame.f_code, 'co_qualname', frame.f_code.co_name)}"
+            if command is None:
+                try:
+                    interaction = frame.f_locals.get('interaction')
+                    command = interaction.command.qualified_name if interaction and interaction.command else None
+                except Exception:
+                    pass
+            if location and command:
+                break
+            frame = frame.f_back
+        return location or "bilinmiyor", command
@@ -3,10 +3,12 @@ import time
 import traceback
 import discord
 from utils.database import db
+from utils.metrics import metrics
 
 def log_execution(command_name: str = None):
     """
     Decorator to log command execution details to SQLite database.
+    Entries are queued and written in batches by the database LogWriter.
     The decorated function should return a dictionary of details to be logged.
     If it returns None, basic argument details are implicitly logged.
     """
@@ -48,9 +50,10 @@ def log_execution(command_name: str = None):
 
                     # If command failed, add status to details
                     status = "FAILED" if error_occurred else "SUCCESS"
+                    metrics.observe_command(actual_cmd_name, execution_time, failed=error_occurred)
                     channel_id = interaction.channel.id if interaction.channel else None
                     
-                    db.log_command(
+                    db.enqueue_log(
                         user_id=interaction.user.id,
                         username=interaction.user.name,
                         command_name=actual_cmd_name,